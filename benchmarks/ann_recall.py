@@ -0,0 +1,118 @@
+# benchmarks/ann_recall.py
+"""
+Recall vs latency of pgvector ANN indexes on a synthetic corpus.
+
+Loads N clustered random 384-d vectors into a scratch table, computes the
+exact top-k with NumPy, then measures recall@k and query latency for HNSW
+across ef_search values and for IVFFlat across probes.
+
+Usage (needs DATABASE_URL; the scratch table is dropped afterwards):
+    python -m benchmarks.ann_recall --rows 100000 --queries 200
+"""
+
+import io
+import os
+import time
+import argparse
+
+import numpy as np
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TABLE = "bench_ann_vectors"
+DIM = 384
+
+
+def synthetic_corpus(rows: int, clusters: int, seed: int = 0) -> np.ndarray:
+    """Gaussian clusters on the unit sphere — closer to real text embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, DIM)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=rows)
+    vectors = centers[labels] + 0.35 * rng.normal(size=(rows, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def to_literal(vector: np.ndarray) -> str:
+    return "[" + ",".join(f"{x:.6f}" for x in vector) + "]"
+
+
+def load(cur, vectors: np.ndarray) -> None:
+    cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cur.execute(f"CREATE TABLE {TABLE} (id integer PRIMARY KEY, embedding vector({DIM}))")
+    buffer = io.StringIO()
+    for i, vector in enumerate(vectors):
+        buffer.write(f"{i}\t{to_literal(vector)}\n")
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {TABLE} (id, embedding) FROM STDIN", buffer)
+
+
+def measure(cur, queries: np.ndarray, truth: np.ndarray, k: int) -> tuple[float, float]:
+    """Return (mean recall@k, p50 latency ms)."""
+    recalls, latencies = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        cur.execute(
+            f"SELECT id FROM {TABLE} ORDER BY embedding <=> %s::vector LIMIT %s",
+            (to_literal(query), k),
+        )
+        found = {row[0] for row in cur.fetchall()}
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(len(found & set(expected)) / k)
+    return float(np.mean(recalls)), float(np.median(latencies))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors = synthetic_corpus(args.rows + args.queries, args.clusters)
+    corpus, queries = vectors[: args.rows], vectors[args.rows :]
+    truth = np.argsort(-(queries @ corpus.T), axis=1)[:, : args.k]
+
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    conn.autocommit = True
+    cur = conn.cursor()
+
+    try:
+        print(f"Loading {args.rows} vectors...")
+        load(cur, corpus)
+        cur.execute("SET maintenance_work_mem = '1GB'")
+
+        recall, latency = measure(cur, queries, truth, args.k)
+        print(f"\n{'index':<10} {'param':<16} {'recall@k':>9} {'p50 ms':>8}")
+        print(f"{'none':<10} {'exact scan':<16} {recall:>9.3f} {latency:>8.2f}")
+
+        start = time.perf_counter()
+        cur.execute(f"CREATE INDEX bench_hnsw ON {TABLE} USING hnsw (embedding vector_cosine_ops)")
+        print(f"{'hnsw':<10} {'build':<16} {'':>9} {1000 * (time.perf_counter() - start):>8.0f}")
+        for ef in (10, 20, 40, 80, 160):
+            cur.execute(f"SET hnsw.ef_search = {ef}")
+            recall, latency = measure(cur, queries, truth, args.k)
+            print(f"{'hnsw':<10} {f'ef_search={ef}':<16} {recall:>9.3f} {latency:>8.2f}")
+        cur.execute("DROP INDEX bench_hnsw")
+
+        lists = max(args.rows // 1000, 10)
+        start = time.perf_counter()
+        cur.execute(
+            f"CREATE INDEX bench_ivf ON {TABLE} USING ivfflat (embedding vector_cosine_ops) "
+            f"WITH (lists = {lists})"
+        )
+        print(f"{'ivfflat':<10} {'build':<16} {'':>9} {1000 * (time.perf_counter() - start):>8.0f}")
+        for probes in (1, 2, 5, 10, 20):
+            cur.execute(f"SET ivfflat.probes = {probes}")
+            recall, latency = measure(cur, queries, truth, args.k)
+            print(f"{'ivfflat':<10} {f'probes={probes}':<16} {recall:>9.3f} {latency:>8.2f}")
+
+    finally:
+        cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/embedding_backends.py
+"""
+Parity, throughput and memory of the embedding backends in src/models.py.
+
+Each backend runs in its own subprocess so peak RSS is measured cleanly.
+Parity compares every backend's vectors with the torch output by cosine
+similarity; the script exits non-zero if any backend falls below the
+tolerance.
+
+Usage:
+    python -m benchmarks.embedding_backends --backends torch onnx onnx-int8
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+PARITY_SENTENCES = [
+    "What is the present perfect tense?",
+    "Explain the difference between since and for.",
+    "present perfect tense enna?",
+    "நிகழ்கால வினைமுற்று என்றால் என்ன?",
+    "प्रेजेंट परफेक्ट टेंस क्या है?",
+    "She has lived in Chennai since 2015.",
+    "A gerund is a verb form ending in -ing that functions as a noun.",
+    "mujhe past participle samjhao",
+]
+
+
+def run_backend(backend: str, batches: int, batch_size: int) -> dict:
+    """Body of the per-backend subprocess."""
+    from src.models import load_embeddings
+
+    start = time.perf_counter()
+    embeddings = load_embeddings(backend=backend)
+    load_seconds = time.perf_counter() - start
+
+    parity = embeddings.embed_documents(PARITY_SENTENCES)
+
+    texts = [f"{PARITY_SENTENCES[i % len(PARITY_SENTENCES)]} #{i}" for i in range(batch_size)]
+    embeddings.embed_documents(texts)  # warm up
+    start = time.perf_counter()
+    for _ in range(batches):
+        embeddings.embed_documents(texts)
+    throughput = batches * batch_size / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for sentence in PARITY_SENTENCES * 4:
+        embeddings.embed_query(sentence)
+    query_ms = 1000 * (time.perf_counter() - start) / (len(PARITY_SENTENCES) * 4)
+
+    return {
+        "backend": backend,
+        "load_s": load_seconds,
+        "docs_per_s": throughput,
+        "query_ms": query_ms,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "vectors": parity,
+    }
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--tolerance", type=float, default=0.98, help="Minimum cosine vs torch")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_backend(args.worker, args.batches, args.batch_size)))
+        return
+
+    results = {}
+    for backend in dict.fromkeys(["torch", *args.backends]):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.embedding_backends", "--worker", backend,
+             "--batches", str(args.batches), "--batch-size", str(args.batch_size)],
+            capture_output=True, text=True, check=True,
+        )
+        results[backend] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    reference = np.asarray(results["torch"]["vectors"])
+    failed = False
+
+    print(f"{'backend':<10} {'load s':>7} {'docs/s':>8} {'query ms':>9} {'RSS MB':>8} {'min cos':>8}")
+    for backend, r in results.items():
+        similarity = cosine(reference, np.asarray(r["vectors"])).min()
+        failed |= similarity < args.tolerance
+        print(
+            f"{backend:<10} {r['load_s']:>7.1f} {r['docs_per_s']:>8.1f} {r['query_ms']:>9.2f} "
+            f"{r['rss_mb']:>8.0f} {similarity:>8.4f}"
+        )
+
+    if failed:
+        print(f"❌ parity below {args.tolerance}")
+        sys.exit(1)
+    print(f"✅ all backends within cosine {args.tolerance} of torch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# benchmarks/fakes.py
+"""
+Local stand-ins for Groq, ElevenLabs and Postgres.
+
+Each fake sleeps for a configurable latency (± jitter) and returns output
+shaped like the real service's, so the whole API can be driven offline.
+`install_fakes()` swaps them into the `src` modules; it must run before
+the first request builds the chain.
+"""
+
+import itertools
+import os
+import random
+import re
+import time
+
+from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, get_buffer_string
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.vectorstores import InMemoryVectorStore
+
+# Answers in the requested language; Tamil/Hindi ones carry their script so
+# the app's matches_language() check accepts them without a translation call
+REPLIES = {
+    "English": "The present perfect links a past action to the present.",
+    "Tamil": "நிகழ்கால வினைமுற்று கடந்த செயலை இப்போதுடன் இணைக்கிறது.",
+    "Hindi": "प्रेजेंट परफेक्ट बीते काम को अभी से जोड़ता है।",
+}
+EXAMPLE = "Example: I have finished my homework. She has lived here since 2015."
+
+DOCUMENTS = [
+    "The present perfect tense is formed with have/has and the past participle.",
+    "Use 'since' with a point in time and 'for' with a duration.",
+    "A gerund is a verb form ending in -ing that functions as a noun.",
+    "The past participle of regular verbs ends in -ed.",
+    "Modal verbs such as can, must and should are followed by the base form.",
+]
+
+_NUMBERED_LINE = re.compile(r"^\[(\d+)\]")
+_replies = itertools.count(1)
+
+
+def delay(latency: float, jitter: float) -> None:
+    """Sleep for `latency` seconds ± a `jitter` fraction of it."""
+    if latency > 0:
+        time.sleep(latency * (1 + random.uniform(-jitter, jitter)))
+
+
+def fake_reply(prompt: str) -> str:
+    """A plausible reply for the prompts the app sends."""
+    language = next((name for name in REPLIES if f"into {name}" in prompt), "English")
+
+    if "Translate each numbered line" in prompt:
+        lines = [line for line in prompt.splitlines() if _NUMBERED_LINE.match(line.strip())]
+        return "\n".join(f"[{i}] {REPLIES[language]}" for i in range(1, len(lines) + 1))
+    if "Translate the following" in prompt:
+        return REPLIES[language]
+    if "running summary" in prompt:
+        return "The student asked about English tenses."
+
+    match = re.search(r"explanation directly in (\w+)", prompt)
+    language = match.group(1) if match and match.group(1) in REPLIES else "English"
+    # Numbered so every answer is new text and TTS can't serve it from cache
+    return f"{REPLIES[language]} ({next(_replies)})\n{EXAMPLE}"
+
+
+class FakeChatModel(BaseChatModel):
+    """ChatGroq stand-in. Streaming spreads the latency over the tokens."""
+
+    latency: float = 0.8
+    jitter: float = 0.25
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-groq"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        delay(self.latency, self.jitter)
+        text = fake_reply(get_buffer_string(messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        words = fake_reply(get_buffer_string(messages)).split(" ")
+        # Roughly a third of the time goes to the first token
+        delay(self.latency / 3, self.jitter)
+        per_token = 2 * self.latency / 3 / len(words)
+        for i, word in enumerate(words):
+            time.sleep(per_token)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else f" {word}"))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+class _Transcript:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _FakeSTT:
+    def __init__(self, latency: float, jitter: float):
+        self.latency = latency
+        self.jitter = jitter
+
+    def convert(self, file, model_id: str, **kwargs) -> _Transcript:
+        file.read()
+        delay(self.latency, self.jitter)
+        return _Transcript("What is the present perfect tense?")
+
+
+class _FakeTTS:
+    def __init__(self, latency: float, jitter: float):
+        self.latency = latency
+        self.jitter = jitter
+
+    def convert(self, text: str, voice_id: str, model_id: str, **kwargs):
+        delay(self.latency, self.jitter)
+        # ~1 KB of "MP3" per 10 characters, delivered in chunks like the SDK stream
+        payload = b"\xff\xfb" + bytes(100 * len(text))
+        for start in range(0, len(payload), 4096):
+            yield payload[start:start + 4096]
+
+
+class FakeElevenLabs:
+    """ElevenLabs client stand-in covering the two calls src/speech.py makes."""
+
+    def __init__(self, stt_latency: float = 0.4, tts_latency: float = 0.5, jitter: float = 0.25):
+        self.speech_to_text = _FakeSTT(stt_latency, jitter)
+        self.text_to_speech = _FakeTTS(tts_latency, jitter)
+
+
+class FakeVectorStore(InMemoryVectorStore):
+    """PGVector stand-in: in-memory cosine search plus a simulated round trip."""
+
+    def __init__(self, embedding, latency: float = 0.005, jitter: float = 0.25):
+        super().__init__(embedding=embedding)
+        self.latency = latency
+        self.jitter = jitter
+        self.add_texts(DOCUMENTS)
+
+    def similarity_search_by_vector(self, embedding, k: int = 4, **kwargs):
+        delay(self.latency, self.jitter)
+        return super().similarity_search_by_vector(embedding, k=k, **kwargs)
+
+
+class FakeChatHistory(InMemoryChatMessageHistory):
+    """PooledChatMessageHistory stand-in."""
+
+    def has_messages(self) -> bool:
+        return bool(self.messages)
+
+
+def offline_env(answer_cache: bool = False) -> None:
+    """
+    Environment for importing `src` without credentials or side effects.
+    Must run before `src` is imported — its modules read these at import.
+    """
+    os.environ.setdefault("GROQ_API_KEY", "offline")
+    os.environ.setdefault("ELEVENLABS_API_KEY", "offline")
+    os.environ.setdefault("DATABASE_URL", "postgresql://offline/benchmark")
+    os.environ["RETRIEVAL_MODE"] = "dense"  # full-text search needs the real Postgres
+    # Persistent caches would turn a second run into all hits
+    os.environ["TTS_CACHE_PATH"] = ""
+    os.environ["TRANSLATION_CACHE_PATH"] = ""
+    if not answer_cache:
+        os.environ["ANSWER_CACHE_THRESHOLD"] = "2"  # cosine never exceeds 1
+
+
+def install_fakes(
+    llm_latency: float = 0.8,
+    stt_latency: float = 0.4,
+    tts_latency: float = 0.5,
+    db_latency: float = 0.005,
+    jitter: float = 0.25,
+    fake_embeddings: bool = False,
+) -> None:
+    """Point every external dependency of the app at a local fake."""
+    from src import app, language, rag, speech
+
+    llm = FakeChatModel(latency=llm_latency, jitter=jitter)
+    rag.llm = llm
+    language.llm = llm
+    speech.client = FakeElevenLabs(stt_latency, tts_latency, jitter)
+
+    rag.PGVector = lambda embeddings, **kwargs: FakeVectorStore(embeddings, db_latency, jitter)
+    sessions: dict[str, FakeChatHistory] = {}
+    rag.get_session_history = app.get_session_history = (
+        lambda session_id: sessions.setdefault(session_id, FakeChatHistory())
+    )
+    app.check_database = lambda: True
+    app.pool_stats = lambda: {"backend": "fake"}
+
+    if fake_embeddings:
+        rag.get_embeddings = lambda: DeterministicFakeEmbedding(size=384)
+
+
+def create_app():
+    """
+    uvicorn app factory for multi-worker runs (python -m src.serve --factory),
+    where each worker installs its own fakes. Latencies come from OFFLINE_*
+    variables, e.g. OFFLINE_LLM_LATENCY=0.8.
+    """
+    offline_env(answer_cache=bool(os.getenv("OFFLINE_ANSWER_CACHE")))
+    latencies = {
+        name: float(os.environ[f"OFFLINE_{name.upper()}"])
+        for name in ("llm_latency", "stt_latency", "tts_latency", "db_latency", "jitter")
+        if f"OFFLINE_{name.upper()}" in os.environ
+    }
+    install_fakes(**latencies)
+
+    from src.app import app
+
+    return app
@@ -0,0 +1,93 @@
+# benchmarks/language_detection.py
+"""
+Accuracy and speed of language.detect_language.
+
+Runs a fixed en/ta/hi corpus (native script, romanized Tamil and Hindi,
+English words that contain Hindi keywords as substrings, and English
+questions using words that double as romanized markers) and times the
+detector per call. tests/test_language.py checks the same corpus.
+
+Usage:
+    python -m benchmarks.language_detection --repeat 2000
+"""
+
+import os
+import argparse
+import time
+from collections import Counter
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from src.language import detect_language  # noqa: E402
+
+CORPUS = [
+    # English
+    ("What is the present perfect tense?", "en"),
+    ("Explain the difference between since and for with examples please.", "en"),
+    ("I always stumble over irregular verbs, can you help me practise?", "en"),
+    ("Is 'customer' a countable noun?", "en"),
+    ("How do I use the word khaki in a sentence?", "en"),
+    ("What does the phrase 'on the other hand' mean in an essay?", "en"),
+    ("Give me five examples of gerunds used as subjects.", "en"),
+    ("Why is it 'an hour' and not 'a hour'?", "en"),
+    # English words and names that are also romanized markers
+    ("Is naan a countable noun?", "en"),
+    ("Hai, what is a gerund?", "en"),
+    ("Is it 'Mera and I' or 'Mera and me'?", "en"),
+    ("How do I pronounce MATLAB?", "en"),
+    ("Illa is my friend. Is 'is' correct here?", "en"),
+    ("Can I say tum for tummy in formal writing?", "en"),
+    # Tamil script
+    ("நிகழ்கால வினைமுற்று என்றால் என்ன?", "ta"),
+    ("present perfect பற்றி விளக்குங்கள்", "ta"),
+    ("ஆங்கிலத்தில் gerund எப்படி பயன்படுத்துவது?", "ta"),
+    # Romanized Tamil
+    ("present perfect tense enna?", "ta"),
+    ("idhu epdi use pannanum solunga", "ta"),
+    ("enakku past participle puriyala", "ta"),
+    ("since and for difference sollunga", "ta"),
+    ("naan english grammar kathukanum", "ta"),
+    ("naan illa", "ta"),
+    # Devanagari Hindi
+    ("प्रेजेंट परफेक्ट टेंस क्या है?", "hi"),
+    ("मुझे gerund समझाइए", "hi"),
+    ("since और for में क्या अंतर है?", "hi"),
+    # Romanized Hindi
+    ("present perfect kya hai?", "hi"),
+    ("gerund kaise use karte hain", "hi"),
+    ("mujhe past participle samjhao", "hi"),
+    ("tum mujhe articles ke bare mein batao", "hi"),
+    ("since aur for ka matlab kya hai", "hi"),
+    ("tum kahan ho", "hi"),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    correct = Counter()
+    total = Counter()
+    for text, expected in CORPUS:
+        got = detect_language(text)
+        total[expected] += 1
+        if got == expected:
+            correct[expected] += 1
+        else:
+            print(f"  MISS  expected={expected} got={got}  {text!r}")
+
+    for lang in ("en", "ta", "hi"):
+        print(f"{lang}: {correct[lang]}/{total[lang]}")
+    print(f"overall accuracy: {sum(correct.values()) / len(CORPUS):.3f}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for text, _ in CORPUS:
+            detect_language(text)
+    calls = args.repeat * len(CORPUS)
+    print(f"{1e6 * (time.perf_counter() - start) / calls:.2f} µs per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/load_test.py
+"""
+Concurrent load test for /ask-text.
+
+Fires a fixed number of requests at each concurrency level and reports
+throughput and latency percentiles, so you can check that requests/sec
+grows with the number of clients instead of flat-lining on one worker.
+
+Usage (with the API running on :8000):
+    python -m benchmarks.load_test --levels 1 2 4 8 16 --requests 32
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+QUESTIONS = [
+    "What is the present perfect tense?",
+    "Explain the difference between since and for.",
+    "present perfect enna?",
+    "When do we use a gerund?",
+    "What is a past participle?",
+]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_level(base_url: str, concurrency: int, total: int, timeout: float) -> dict:
+    """Send `total` requests with at most `concurrency` in flight."""
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            while True:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                params = {
+                    "question": QUESTIONS[i % len(QUESTIONS)],
+                    "session_id": str(uuid.uuid4()),
+                }
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/ask-text", params=params)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 95),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=32, help="Requests per level")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    print(f"{'clients':>8} {'req/s':>8} {'p50 s':>8} {'p95 s':>8} {'errors':>7}")
+    for level in args.levels:
+        r = await run_level(args.base_url, level, args.requests, args.timeout)
+        print(
+            f"{r['concurrency']:>8} {r['rps']:>8.2f} {r['p50']:>8.2f} "
+            f"{r['p95']:>8.2f} {r['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,253 @@
+# benchmarks/offline.py
+"""
+Offline end-to-end benchmark with local stand-ins for Groq, ElevenLabs and Postgres.
+
+Starts the API in a subprocess with the fakes from benchmarks/fakes.py
+installed, then drives /ask-text and /ask-voice at each concurrency level
+and reports throughput, p50/p95/p99 latency and the mean time per stage
+(from the Server-Timing header). No credentials or database needed.
+
+Every run is appended to benchmarks/results/offline.jsonl together with
+the git commit, and compared against the latest run of another commit
+with the same settings, so regressions show up between commits.
+
+Usage:
+    python -m benchmarks.offline --levels 1 4 16 --requests 48
+    python -m benchmarks.offline --llm-latency 1.5 --tts-latency 0.8 --no-save
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from .load_test import QUESTIONS, percentile
+from .startup import wait_for
+
+RESULTS_PATH = Path(__file__).parent / "results" / "offline.jsonl"
+
+# Settings that change what is measured; runs are only compared when equal
+FAKE_SETTINGS = (
+    "llm_latency", "stt_latency", "tts_latency", "db_latency", "jitter",
+    "fake_embeddings", "answer_cache",
+)
+
+
+def voice_clip(rate: int = 44100) -> bytes:
+    """A WAV that passes the app's VAD: a 2 s tone between quiet, noisy edges."""
+    from src.audio import encode_wav
+
+    rng = np.random.default_rng(0)
+    edge = 0.002 * rng.standard_normal(rate // 2)
+    t = np.arange(2 * rate) / rate
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+    return encode_wav(np.concatenate([edge, tone, edge]).astype(np.float32), rate)
+
+
+def parse_server_timing(header: str | None) -> dict[str, float]:
+    """'llm;dur=812.4, tts;dur=301.0' -> {'llm': 812.4, 'tts': 301.0}"""
+    timings = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        if params.startswith("dur="):
+            timings[name] = float(params[4:])
+    return timings
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    concurrency: int,
+    total: int,
+    audio_format: str,
+    clip: bytes,
+) -> dict:
+    """Send `total` requests to `endpoint` with at most `concurrency` in flight."""
+    latencies: list[float] = []
+    stages: dict[str, float] = {}
+    errors = 0
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def worker() -> None:
+        nonlocal errors
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            params = {"session_id": str(uuid.uuid4()), "audio_format": audio_format}
+            start = time.perf_counter()
+            try:
+                if endpoint == "/ask-voice":
+                    files = {"file": ("question.wav", clip, "audio/wav")}
+                    response = await client.post(endpoint, params=params, files=files)
+                else:
+                    params["question"] = QUESTIONS[i % len(QUESTIONS)]
+                    response = await client.post(endpoint, params=params)
+                if response.status_code != 200:
+                    errors += 1
+                for name, ms in parse_server_timing(response.headers.get("server-timing")).items():
+                    stages[name] = stages.get(name, 0.0) + ms
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "rps": total / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "stages_ms": {name: ms / total for name, ms in stages.items()},
+    }
+
+
+def git_revision() -> tuple[str, bool]:
+    """(short commit, whether tracked files have uncommitted changes)."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True,
+        ).stdout.strip()
+        return commit, bool(dirty)
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def previous_run(commit: str, settings: dict) -> dict | None:
+    """Latest saved run of a different commit with the same settings."""
+    if not RESULTS_PATH.exists():
+        return None
+    previous = None
+    for line in RESULTS_PATH.read_text().splitlines():
+        run = json.loads(line)
+        if run["commit"] != commit and run["settings"] == settings:
+            previous = run
+    return previous
+
+
+def change(new: float, old: float) -> str:
+    return f"{100 * (new - old) / old:+.0f}%" if old else "n/a"
+
+
+def serve(args) -> None:
+    """Body of the server subprocess: install the fakes, then run uvicorn."""
+    from .fakes import install_fakes, offline_env
+
+    offline_env(answer_cache=args.answer_cache)
+    install_fakes(
+        llm_latency=args.llm_latency,
+        stt_latency=args.stt_latency,
+        tts_latency=args.tts_latency,
+        db_latency=args.db_latency,
+        jitter=args.jitter,
+        fake_embeddings=args.fake_embeddings,
+    )
+
+    import uvicorn
+    from src.app import app
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+async def drive(args) -> list[dict]:
+    clip = voice_clip()
+    results = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=args.timeout) as client:
+        for endpoint in args.endpoints:
+            for level in args.levels:
+                results.append(await run_level(client, endpoint, level, args.requests, args.audio_format, clip))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--endpoints", nargs="+", default=["/ask-text", "/ask-voice"])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=48, help="Requests per level")
+    parser.add_argument("--audio-format", default="url", choices=["base64", "url"])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="Seconds per Groq call")
+    parser.add_argument("--stt-latency", type=float, default=0.4, help="Seconds per STT call")
+    parser.add_argument("--tts-latency", type=float, default=0.5, help="Seconds per TTS chunk")
+    parser.add_argument("--db-latency", type=float, default=0.005, help="Seconds per vector search")
+    parser.add_argument("--jitter", type=float, default=0.25, help="± fraction of each latency")
+    parser.add_argument("--fake-embeddings", action="store_true",
+                        help="Skip the local embedding model too")
+    parser.add_argument("--answer-cache", action="store_true",
+                        help="Leave the semantic answer cache on (repeated questions hit it)")
+    parser.add_argument("--no-save", action="store_true", help="Don't append to the results file")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    settings = {name: getattr(args, name) for name in FAKE_SETTINGS}
+    flags = [f"--{name.replace('_', '-')}" for name in ("fake_embeddings", "answer_cache") if settings[name]]
+    server = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.offline", "--serve", "--port", str(args.port),
+        *(f"--{name.replace('_', '-')}={settings[name]}" for name in FAKE_SETTINGS[:5]),
+        *flags,
+    ])
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{args.port}", timeout=1.0) as client:
+            if not wait_for(client, "/health/ready", time.monotonic() + 300):
+                raise TimeoutError("offline server never became ready")
+        results = asyncio.run(drive(args))
+    finally:
+        server.terminate()
+        server.wait()
+
+    commit, dirty = git_revision()
+    previous = previous_run(commit, settings)
+    baseline = {
+        (r["endpoint"], r["concurrency"]): r for r in (previous["results"] if previous else [])
+    }
+
+    print(f"{'endpoint':<11} {'clients':>7} {'req/s':>7} {'p50 s':>7} {'p95 s':>7} "
+          f"{'p99 s':>7} {'errors':>6}  vs {previous['commit'] if previous else '-'}")
+    for r in results:
+        old = baseline.get((r["endpoint"], r["concurrency"]))
+        delta = f"p95 {change(r['p95'], old['p95'])}, req/s {change(r['rps'], old['rps'])}" if old else ""
+        print(
+            f"{r['endpoint']:<11} {r['concurrency']:>7} {r['rps']:>7.2f} {r['p50']:>7.2f} "
+            f"{r['p95']:>7.2f} {r['p99']:>7.2f} {r['errors']:>6}  {delta}"
+        )
+        print("    " + ", ".join(f"{name} {ms:.0f}ms" for name, ms in r["stages_ms"].items()))
+
+    if not args.no_save:
+        RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with RESULTS_PATH.open("a") as f:
+            f.write(json.dumps({
+                "commit": commit,
+                "dirty": dirty,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "settings": settings,
+                "results": results,
+            }) + "\n")
+        print(f"saved to {RESULTS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/query_embedding.py
+"""
+Query embedding throughput: direct embed_query vs the micro-batching QueryEmbedder.
+
+Runs the real MiniLM model on CPU. Every query is unique so the LRU never
+hits and only batching is measured.
+
+Usage:
+    python -m benchmarks.query_embedding --levels 1 8 32 --queries 256
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.embedding_service import QueryEmbedder
+from src.models import load_embeddings
+
+
+def throughput(embed, queries: list[str], concurrency: int) -> float:
+    """Embeddings per second with `concurrency` threads calling `embed`."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(embed, queries))
+    return len(queries) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--queries", type=int, default=256)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    embeddings = load_embeddings()
+    embeddings.embed_query("warm up")
+
+    print(f"{'clients':>8} {'direct/s':>10} {'batched/s':>10} {'avg batch':>10}")
+    for level in args.levels:
+        queries = [f"question {level}-{i}: what is the present perfect?" for i in range(args.queries)]
+
+        direct = throughput(embeddings.embed_query, queries, level)
+
+        embedder = QueryEmbedder(embeddings, window_ms=args.window_ms)
+        batched = throughput(embedder.embed_query, [q + " (batched)" for q in queries], level)
+
+        print(
+            f"{level:>8} {direct:>10.1f} {batched:>10.1f} "
+            f"{embedder.stats()['avg_batch_size']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# benchmarks/retrieval_eval.py
+"""
+Retrieval quality and latency: dense vs full-text vs hybrid (vs reranked).
+
+Runs a fixed set of tutoring questions against the ingested collection and
+judges each retrieved chunk against hand labels: per question, the chunk
+IDs, PDF sources or source pages ("source#page", 1-based) that answer it.
+Labels belong to the corpus you ingested, so they live in a JSON file:
+
+    {"What is a gerund?": ["grammar/verbs.pdf#12", "3f9c...e1"], ...}
+
+Judging by labels rather than by query terms keeps the comparison fair;
+a term match rewards whichever ranking matches words, i.e. full-text.
+To start a labels file, --pool writes the top-k candidates of every mode
+per question (with a text preview) for judging. Reports hit@k, MRR@k and
+p50/p95 latency per mode; hybrid needs `python -m src.vector_index create`.
+
+Usage (needs DATABASE_URL and an ingested collection):
+    python -m benchmarks.retrieval_eval --pool pool.json
+    python -m benchmarks.retrieval_eval --labels labels.json
+    RERANKER_MODEL=cross-encoder/mmarco-mMiniLMv2-L12-H384-v1 python -m benchmarks.retrieval_eval --labels labels.json
+"""
+
+import json
+import argparse
+import time
+
+from .load_test import percentile
+
+EVAL_QUESTIONS = [
+    "What is a gerund?",
+    "When do we use a gerund instead of an infinitive?",
+    "What is a past participle?",
+    "past participle enna?",
+    "What is the present perfect tense?",
+    "present perfect tense eppo use pannanum?",
+    "प्रेजेंट परफेक्ट टेंस क्या है?",
+    "Explain the difference between since and for.",
+    "How do I use modal verbs like can and must?",
+    "What is the passive voice?",
+    "Give examples of irregular verbs.",
+    "What are articles a, an and the?",
+    "Explain countable and uncountable nouns.",
+    "What is a conditional sentence?",
+    "How is the simple past tense formed?",
+    "What is reported speech?",
+    "Difference between adjective and adverb?",
+    "What is a phrasal verb?",
+    "When do we use the continuous tense?",
+    "What is subject verb agreement?",
+]
+
+
+def page_key(doc) -> str:
+    """'source#page' (1-based) for a retrieved chunk."""
+    page = doc.metadata.get("page")
+    source = doc.metadata.get("source", "")
+    return f"{source}#{page + 1}" if page is not None else source
+
+
+def is_relevant(doc, labels: set[str]) -> bool:
+    """A chunk is relevant if its ID, its source or its source page is labelled."""
+    return bool({doc.id, doc.metadata.get("source"), page_key(doc)} & labels)
+
+
+def first_relevant(docs: list, labels: set[str]) -> int | None:
+    """1-based rank of the first labelled chunk, or None."""
+    for rank, doc in enumerate(docs, 1):
+        if is_relevant(doc, labels):
+            return rank
+    return None
+
+
+def load_labels(path: str) -> dict[str, set[str]]:
+    """Labelled eval questions; questions without labels are left out."""
+    with open(path, encoding="utf-8") as f:
+        labels = {question: set(keys) for question, keys in json.load(f).items() if keys}
+    unknown = set(labels) - set(EVAL_QUESTIONS)
+    if unknown:
+        raise SystemExit(f"Labels for questions not in the eval set: {sorted(unknown)}")
+    return labels
+
+
+def write_pool(retrievers: list, path: str) -> None:
+    """Union of every mode's results per question, for hand labelling."""
+    pool = {}
+    for question in EVAL_QUESTIONS:
+        candidates: dict[str, dict] = {}
+        for name, retriever in retrievers:
+            for doc in retriever.retrieve(question):
+                entry = candidates.setdefault(doc.id, {
+                    "id": doc.id,
+                    "page": page_key(doc),
+                    "preview": " ".join(doc.page_content.split())[:200],
+                    "modes": [],
+                })
+                entry["modes"].append(name)
+        pool[question] = list(candidates.values())
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(pool, f, ensure_ascii=False, indent=2)
+
+
+def evaluate(retriever, labels: dict[str, set[str]], rounds: int) -> dict:
+    hits = 0
+    reciprocal_ranks = 0.0
+    latencies = []
+    for _ in range(rounds):
+        for question, relevant in labels.items():
+            start = time.perf_counter()
+            docs = retriever.retrieve(question)
+            latencies.append(time.perf_counter() - start)
+            rank = first_relevant(docs, relevant)
+            if rank is not None:
+                hits += 1
+                reciprocal_ranks += 1 / rank
+    total = rounds * len(labels)
+    return {
+        "hit": hits / total,
+        "mrr": reciprocal_ranks / total,
+        "p50_ms": 1000 * percentile(latencies, 50),
+        "p95_ms": 1000 * percentile(latencies, 95),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--labels", help="JSON file: question -> relevant chunk IDs / sources / pages")
+    target.add_argument("--pool", help="Write every mode's candidates per question to this JSON file")
+    parser.add_argument("--modes", nargs="+", default=["dense", "lexical", "hybrid"])
+    parser.add_argument("--rounds", type=int, default=1, help="Passes over the eval set")
+    args = parser.parse_args()
+
+    labels = load_labels(args.labels) if args.labels else None
+
+    from src.models import RERANKER_MODEL, get_reranker
+    from src.rag import build_retriever
+
+    runs = [(mode, None) for mode in args.modes]
+    reranker = get_reranker()
+    if reranker is not None:
+        runs.append(("hybrid+rerank", reranker))
+
+    retrievers = [(name, build_retriever(name.split("+")[0], model)) for name, model in runs]
+    for _, retriever in retrievers:
+        retriever.retrieve("warm up")  # model load, connection pool, embedder cache
+
+    if args.pool:
+        write_pool(retrievers, args.pool)
+        print(f"Candidates for {len(EVAL_QUESTIONS)} questions written to {args.pool}")
+        return
+    if not labels:
+        raise SystemExit(f"No labelled questions in {args.labels}")
+
+    k = retrievers[0][1].k
+    print(f"{len(labels)}/{len(EVAL_QUESTIONS)} labelled questions x {args.rounds} rounds, k={k}"
+          + (f", reranker {RERANKER_MODEL}" if reranker is not None else ""))
+    print(f"{'mode':<15} {f'hit@{k}':>7} {f'MRR@{k}':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, retriever in retrievers:
+        r = evaluate(retriever, labels, args.rounds)
+        print(f"{name:<15} {r['hit']:>7.2f} {r['mrr']:>7.2f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
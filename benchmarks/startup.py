@@ -0,0 +1,69 @@
+# benchmarks/startup.py
+"""
+Worker cold/warm start time.
+
+Launches the API with uvicorn and measures, from process start:
+  - time until /health/live answers (import + server up)
+  - time until /health/ready returns 200 (model, chain and DB warmed up)
+
+Run it twice: the first run after clearing MODEL_CACHE_DIR is a cold
+start, later runs load the model from the local cache.
+
+Usage:
+    python -m benchmarks.startup --runs 3
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def wait_for(client: httpx.Client, path: str, deadline: float, status: int = 200) -> bool:
+    while time.monotonic() < deadline:
+        try:
+            if client.get(path).status_code == status:
+                return True
+        except httpx.TransportError:
+            pass
+        time.sleep(0.05)
+    return False
+
+
+def measure(port: int, timeout: float) -> tuple[float, float]:
+    start = time.monotonic()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.app:app", "--port", str(port), "--log-level", "warning"],
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            deadline = start + timeout
+            if not wait_for(client, "/health/live", deadline):
+                raise TimeoutError("server never became live")
+            live = time.monotonic() - start
+            if not wait_for(client, "/health/ready", deadline):
+                raise TimeoutError("server never became ready")
+            ready = time.monotonic() - start
+        return live, ready
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    print(f"{'run':>4} {'live s':>8} {'ready s':>8}")
+    for run in range(1, args.runs + 1):
+        live, ready = measure(args.port, args.timeout)
+        print(f"{run:>4} {live:>8.2f} {ready:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/tts_chunks.py
+"""
+Sequential vs concurrent TTS chunk synthesis.
+
+Swaps the ElevenLabs client for a fake with a fixed per-call latency and
+times a long Tamil answer through both the old one-by-one loop and
+speech.synthesize_chunks. No API key or network access is needed.
+
+Usage:
+    python -m benchmarks.tts_chunks --latency 0.8 --chars 1000
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("ELEVENLABS_API_KEY", "benchmark")
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("TTS_CACHE_PATH", "")  # measure synthesis, not cache hits
+
+from src import speech  # noqa: E402
+
+
+class FakeTextToSpeech:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def convert(self, text: str, voice_id: str, model_id: str):
+        time.sleep(self.latency)
+        # Roughly the size of real MP3 output: ~1 KB per 10 characters
+        yield b"\xff" * (len(text.encode()) * 100)
+
+
+class FakeClient:
+    def __init__(self, latency: float):
+        self.text_to_speech = FakeTextToSpeech(latency)
+
+
+def sequential(chunks: list[str], voice_id: str) -> bytes:
+    """The original loop: one call after another, bytes concatenation."""
+    audio = b""
+    for chunk in chunks:
+        stream = speech.client.text_to_speech.convert(
+            text=chunk, voice_id=voice_id, model_id=speech.TTS_MODEL_ID
+        )
+        audio += b"".join(stream)
+    return audio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.8, help="Seconds per API call")
+    parser.add_argument("--chars", type=int, default=1000, help="Answer length in characters")
+    args = parser.parse_args()
+
+    speech.client = FakeClient(args.latency)
+
+    sentence = "நிகழ்கால வினைமுற்று ஒரு செயல் இப்போது முடிந்ததைக் குறிக்கிறது. "
+    text = (sentence * (args.chars // len(sentence) + 1))[: args.chars]
+    chunks = speech.split_for_tts(text)
+    voice_id = speech.VOICE_MAP["ta"]
+
+    start = time.perf_counter()
+    seq_audio = sequential(chunks, voice_id)
+    seq_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    par_audio = speech.synthesize_chunks(chunks, voice_id)
+    par_time = time.perf_counter() - start
+
+    assert seq_audio == par_audio, "concurrent output differs from sequential"
+
+    print(f"chunks: {len(chunks)}  workers: {speech.TTS_MAX_WORKERS}")
+    print(f"sequential: {seq_time:.2f}s")
+    print(f"concurrent: {par_time:.2f}s  ({seq_time / par_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
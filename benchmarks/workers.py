@@ -0,0 +1,160 @@
+# benchmarks/workers.py
+"""
+Memory per worker and throughput as uvicorn workers are added.
+
+For each worker count, starts `python -m src.serve --workers N`, drives
+/ask-text at a fixed concurrency, then reads RSS and PSS (proportional
+set size: shared pages split between the processes using them) of every
+worker and of the embedding sidecar from /proc. With the sidecar, worker
+PSS should stay flat while the model is counted once.
+
+By default the API runs on the offline fakes from benchmarks/fakes.py
+(real embedding model, fake Groq/ElevenLabs/Postgres); --live uses the
+real services from .env. Linux only.
+
+Usage:
+    python -m benchmarks.workers --workers 1 2 4 --concurrency 32 --requests 128
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from .offline import run_level
+
+
+def children(pid: int) -> list[int]:
+    """All descendants of `pid`."""
+    parents: dict[int, list[int]] = {}
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        parents.setdefault(int(fields[1]), []).append(int(stat.parent.name))
+
+    found, stack = [], [pid]
+    while stack:
+        for child in parents.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def memory_mb(pid: int) -> tuple[float, float]:
+    """(RSS, PSS) of a process in MB."""
+    values = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        name, _, rest = line.partition(":")
+        if name in ("Rss", "Pss"):
+            values[name] = int(rest.split()[0]) / 1024
+    return values.get("Rss", 0.0), values.get("Pss", 0.0)
+
+
+def role(pid: int) -> str:
+    cmdline = Path(f"/proc/{pid}/cmdline").read_bytes().replace(b"\0", b" ").decode()
+    if "src.embedding_server" in cmdline:
+        return "sidecar"
+    if "spawn_main" in cmdline:  # uvicorn workers are multiprocessing spawns
+        return "worker"
+    return "other"
+
+
+def ready(client: httpx.Client, workers: int, deadline: float) -> bool:
+    """/health/ready hits one worker at a time; wait for a run of 200s."""
+    streak = 0
+    while time.monotonic() < deadline:
+        try:
+            ok = client.get("/health/ready").status_code == 200
+        except httpx.TransportError:
+            ok = False
+        streak = streak + 1 if ok else 0
+        if streak >= 4 * workers:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def measure(args, workers: int) -> dict:
+    env = dict(os.environ)
+    command = [sys.executable, "-m", "src.serve", "--workers", str(workers), "--port", str(args.port)]
+    if not args.live:
+        command += ["--app", "benchmarks.fakes:create_app", "--factory"]
+        env.update({
+            "OFFLINE_LLM_LATENCY": str(args.llm_latency),
+            "OFFLINE_TTS_LATENCY": str(args.tts_latency),
+        })
+
+    server = subprocess.Popen(command, env=env)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{args.port}", timeout=1.0) as client:
+            if not ready(client, workers, time.monotonic() + args.timeout):
+                raise TimeoutError(f"{workers} worker(s) never became ready")
+
+        async def drive() -> dict:
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{args.port}", timeout=args.timeout,
+            ) as client:
+                return await run_level(
+                    client, "/ask-text", args.concurrency, args.requests, "url", b"",
+                )
+
+        result = asyncio.run(drive())
+
+        usage: dict[str, list[tuple[float, float]]] = {"worker": [], "sidecar": []}
+        for pid in children(server.pid):
+            kind = role(pid)
+            if kind in usage:
+                usage[kind].append(memory_mb(pid))
+        if workers == 1:
+            # Single-worker mode serves from the main process, with the model inside
+            usage["worker"].append(memory_mb(server.pid))
+    finally:
+        server.terminate()
+        server.wait()
+
+    worker_rss = [rss for rss, _ in usage["worker"]]
+    worker_pss = [pss for _, pss in usage["worker"]]
+    return {
+        "workers": workers,
+        "rps": result["rps"],
+        "p95": result["p95"],
+        "errors": result["errors"],
+        "worker_rss": sum(worker_rss) / len(worker_rss) if worker_rss else 0.0,
+        "worker_pss": sum(worker_pss) / len(worker_pss) if worker_pss else 0.0,
+        "sidecar_rss": sum(rss for rss, _ in usage["sidecar"]),
+        "total_pss": sum(worker_pss) + sum(pss for _, pss in usage["sidecar"]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=128)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--tts-latency", type=float, default=0.5)
+    parser.add_argument("--live", action="store_true", help="Use the real services from .env")
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'req/s':>7} {'p95 s':>7} {'errors':>6} "
+          f"{'worker RSS':>11} {'worker PSS':>11} {'sidecar RSS':>12} {'total PSS':>10}")
+    for workers in args.workers:
+        r = measure(args, workers)
+        print(
+            f"{r['workers']:>7} {r['rps']:>7.2f} {r['p95']:>7.2f} {r['errors']:>6} "
+            f"{r['worker_rss']:>9.0f}MB {r['worker_pss']:>9.0f}MB "
+            f"{r['sidecar_rss']:>10.0f}MB {r['total_pss']:>8.0f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# src/answer_cache.py
+
+import os
+import json
+import time
+import uuid
+import threading
+
+import numpy as np
+
+from .cache import LRUCache, SqliteStore
+
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+ANSWER_CACHE_MAX_ITEMS = int(os.getenv("ANSWER_CACHE_MAX_ITEMS", "2000"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", str(24 * 60 * 60)))
+# Shared with other workers when set (src/serve.py does); memory-only otherwise
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", "")
+
+
+class SemanticAnswerCache:
+    """
+    Reuses answers to previously asked questions that mean the same thing.
+
+    Questions are embedded with the retrieval model; a lookup returns the
+    stored answer of the most similar question in the same language if its
+    cosine similarity clears `threshold`.
+
+    With a `path`, answers are also written to a shared SQLite file and
+    every lookup first pulls in rows other workers added since the last one.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        max_items: int = ANSWER_CACHE_MAX_ITEMS,
+        ttl: float | None = ANSWER_CACHE_TTL,
+        path: str = ANSWER_CACHE_PATH,
+    ):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        # Entries are (language, unit vector, question, answer); size = 1 per entry
+        self._entries = LRUCache(max_items=max_items, ttl=ttl, sizeof=lambda _: 1)
+        self._shared = SqliteStore(path, table="answers", ttl=ttl) if path else None
+        self._synced_rowid = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.lookup_seconds = 0.0
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _sync(self) -> None:
+        """Load answers other workers stored since the last sync."""
+        if self._shared is None:
+            return
+        with self._lock:
+            rows = self._shared.since(self._synced_rowid)
+            if not rows:
+                return
+            self._synced_rowid = rows[-1][0]
+        for _, key, value in rows:
+            entry = json.loads(value)
+            vector = np.asarray(entry["vector"], dtype=np.float32)
+            self._entries.set(key, (entry["language"], vector, entry["question"], entry["answer"]))
+
+    def lookup(self, question: str, language: str) -> str | None:
+        """Return a cached answer for a near-identical question, or None."""
+        start = time.perf_counter()
+        self._sync()
+        vector = self._embed(question)
+
+        candidates = [
+            (key, entry) for key, entry in self._entries.items() if entry[0] == language
+        ]
+
+        answer = None
+        if candidates:
+            matrix = np.stack([entry[1] for _, entry in candidates])
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                key = candidates[best][0]
+                entry = self._entries.get(key)  # refreshes LRU position / TTL check
+                if entry is not None:
+                    answer = entry[3]
+
+        with self._lock:
+            self.lookup_seconds += time.perf_counter() - start
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return answer
+
+    def store(self, question: str, language: str, answer: str) -> None:
+        if not answer:
+            return
+        key, vector = str(uuid.uuid4()), self._embed(question)
+        self._entries.set(key, (language, vector, question, answer))
+        if self._shared is not None:
+            self._shared.set(key, json.dumps({
+                "language": language,
+                "vector": vector.tolist(),
+                "question": question,
+                "answer": answer,
+            }).encode("utf-8"))
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.bypassed += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "evictions": self._entries.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "avg_lookup_ms": round(1000 * self.lookup_seconds / lookups, 2) if lookups else 0.0,
+        }
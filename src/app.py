@@ -1,20 +1,171 @@
 # src/app.py
 
 import os
+import json
+import time
 import uuid
-import shutil
-import tempfile
+import base64
+import random
+import asyncio
+import threading
 import traceback
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from langchain_core.messages import AIMessage, HumanMessage
+from pydantic import BaseModel
+
+from .rag import (
+    answer_input,
+    format_docs,
+    get_answer_chain,
+    get_query_embedder,
+    get_retriever,
+    get_session_history,
+)
+from .answer_cache import SemanticAnswerCache
+from .db import pool_stats, check_database
+from .audio import MAX_AUDIO_BYTES, AudioTooLarge, read_limited, prepare_for_stt, vad_stats
+from .speech import speech_to_text, synthesize_speech, tts_cache
+from .audio_store import audio_store, parse_range
+from .language import (
+    detect_language,
+    translate_text,
+    matches_language,
+    get_language_name,
+    translation_stats,
+)
+from .streaming import SentenceBuffer, sse_event
+from .metrics import (
+    REQUEST_SECONDS,
+    STAGE_WAIT_SECONDS,
+    prompt_tokens,
+    record,
+    render_metrics,
+    server_timing,
+    stage,
+    start_request,
+)
+
+# ===============================
+# LAZY MODEL LOADING + WARM-UP
+# ===============================
+# Nothing heavy happens at import: the retriever (embedding model + PGVector)
+# is built on first use, and a background warm-up triggers that right
+# after startup so the worker can report liveness immediately and
+# readiness once the model is loaded.
+@lru_cache(maxsize=1)
+def get_answer_cache() -> SemanticAnswerCache:
+    # Near-duplicate questions are answered from here without an LLM call
+    return SemanticAnswerCache(get_query_embedder())
+
+
+# A failed warm-up (database or model not reachable yet at boot) is retried
+# with backoff, so the worker turns ready once the dependency recovers
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "1"))
+WARMUP_RETRY_MAX_SECONDS = float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "30"))
+
+warmup_state = {"ready": False, "seconds": None, "attempts": 0, "error": None}
+
+
+def warm_up_once() -> None:
+    get_retriever()
+    get_answer_cache()
+    get_query_embedder().embed_query("warm up")  # first forward pass initializes kernels
+    if not check_database():
+        raise RuntimeError("database unreachable")
+
+
+def warm_up() -> None:
+    start = time.perf_counter()
+    delay = WARMUP_RETRY_SECONDS
+    while True:
+        warmup_state["attempts"] += 1
+        try:
+            warm_up_once()
+            break
+        except Exception as e:
+            if warmup_state["error"] is None:
+                traceback.print_exc()
+            warmup_state["error"] = str(e)
+            print(f"[WARMUP] attempt {warmup_state['attempts']} failed ({e}), retrying in {delay:.0f}s")
+            time.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+
+    warmup_state.update(ready=True, error=None, seconds=round(time.perf_counter() - start, 2))
+    print(f"[WARMUP] ready in {warmup_state['seconds']}s after {warmup_state['attempts']} attempt(s)")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    threading.Thread(target=warm_up, name="warmup", daemon=True).start()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+# ===============================
+# CONCURRENCY
+# ===============================
+# Every pipeline stage below is a blocking network call (Groq, ElevenLabs).
+# Running them inline would hold the event loop for seconds and serialize
+# the whole worker, so each stage runs in a worker thread behind its own
+# semaphore — one slow upstream can only tie up its own slots. Database and
+# local stages (history, context, answer_cache) have no semaphore: the
+# connection pool and thread pool already bound them.
+STAGE_LIMITS = {
+    "stt": int(os.getenv("STT_CONCURRENCY", "4")),
+    "llm": int(os.getenv("LLM_CONCURRENCY", "8")),
+    "translate": int(os.getenv("TRANSLATE_CONCURRENCY", "4")),
+    "tts": int(os.getenv("TTS_CONCURRENCY", "4")),
+}
+
+_stage_semaphores = {
+    stage: asyncio.Semaphore(limit) for stage, limit in STAGE_LIMITS.items()
+}
+
+
+async def run_stage(name: str, func, *args):
+    """Run a blocking pipeline stage in a worker thread, bounded and timed per stage."""
+    if name not in _stage_semaphores:
+        with stage(name):
+            return await asyncio.to_thread(func, *args)
+
+    queued = time.perf_counter()
+    async with _stage_semaphores[name]:
+        record(name, time.perf_counter() - queued, STAGE_WAIT_SECONDS)
+        with stage(name):
+            return await asyncio.to_thread(func, *args)
+
+
+# ===============================
+# TRACING / TIMING
+# ===============================
+# Fixed label set — /audio/{id} paths must not create one series per clip
+_TIMED_PATHS = {"/ask-text", "/ask-text-stream", "/ask-voice", "/ask-batch"}
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from .rag import get_qa_chain
-from .speech import speech_to_text, text_to_speech
-from .language import detect_language, translate_text
 
-app = FastAPI()
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Give every request a trace ID (honouring an incoming X-Trace-Id) and
+    report its stage timings in a Server-Timing header. Streaming responses
+    send headers before generation starts, so theirs only cover the stages
+    run up front; the histograms still see everything.
+    """
+    trace_id = start_request(request.headers.get("x-trace-id"))
+    start = time.perf_counter()
+    response = await call_next(request)
 
-# Initialize the RAG chain once at startup
-qa_chain = get_qa_chain()
+    path = request.url.path if request.url.path in _TIMED_PATHS else "other"
+    REQUEST_SECONDS.labels(path, str(response.status_code)).observe(time.perf_counter() - start)
+    response.headers["X-Trace-Id"] = trace_id
+    timing = server_timing()
+    if timing:
+        response.headers["Server-Timing"] = timing
+    return response
 
 
 def sanitize_lang(value: str | None) -> str | None:
@@ -27,17 +178,167 @@ def sanitize_lang(value: str | None) -> str | None:
     return value.strip()
 
 
-def invoke_chain(question: str, language: str, session_id: str) -> str:
+def is_cacheable(session_id: str) -> bool:
+    """
+    Only first turns go through the answer cache: once a session has history,
+    the answer may depend on earlier turns, so it is neither served from
+    nor stored in the cache.
+    """
+    if get_session_history(session_id).has_messages():
+        get_answer_cache().record_bypass()
+        return False
+    return True
+
+
+def cached_answer(question: str, language: str, session_id: str) -> str | None:
+    """
+    Look up a semantically cached answer. On a hit the turn is still written
+    to the session history so follow-up questions have their context.
+    """
+    with stage("answer_cache"):
+        answer = get_answer_cache().lookup(question, language)
+    if answer is not None:
+        get_session_history(session_id).add_messages([
+            HumanMessage(content=question),
+            AIMessage(content=answer),
+        ])
+    return answer
+
+
+def load_history(session_id: str) -> list:
+    return get_session_history(session_id).messages
+
+
+def save_turn(session_id: str, question: str, answer: str) -> None:
+    get_session_history(session_id).add_messages([
+        HumanMessage(content=question),
+        AIMessage(content=answer),
+    ])
+
+
+def retrieve_context(question: str) -> str:
+    return format_docs(get_retriever().retrieve(question))
+
+
+def retrieve_contexts(questions: list[str]) -> list[str]:
+    return [format_docs(docs) for docs in get_retriever().retrieve_many(questions)]
+
+
+def lookup_answer(question: str, language: str) -> str | None:
+    return get_answer_cache().lookup(question, language)
+
+
+def store_answer(question: str, language: str, answer: str) -> None:
+    get_answer_cache().store(question, language, answer)
+
+
+async def check_answer_cache(question: str, output_language: str, session_id: str) -> tuple[bool, str | None]:
+    """(cacheable, cached answer or None) for this turn."""
+    cacheable = await run_stage("history", is_cacheable, session_id)
+    if not cacheable:
+        return False, None
+    return True, await asyncio.to_thread(cached_answer, question, output_language, session_id)
+
+
+async def answer_inputs(question: str, input_language: str, output_language: str, session_id: str) -> dict:
     """
-    Invoke the RAG chain and extract the text response.
-    ✅ FIXED: Returns result.content directly since ChatGroq always returns AIMessage.
-    No longer uses fragile getattr fallback.
+    Answer-chain inputs for one turn: the session's history window and the
+    retrieved context, loaded concurrently. The answer is generated directly
+    in the output language.
     """
-    result = qa_chain.invoke(
-        {"question": question, "language": language},
-        config={"configurable": {"session_id": session_id}},
+    history, context = await asyncio.gather(
+        run_stage("history", load_history, session_id),
+        run_stage("context", retrieve_context, question),
     )
-    return result.content
+    return answer_input(
+        question,
+        get_language_name(input_language),
+        get_language_name(output_language),
+        context,
+        history,
+    )
+
+
+async def remember(question: str, output_language: str, session_id: str, answer: str, cacheable: bool) -> None:
+    """Write the turn to the session history and, for first turns, the answer cache."""
+    await run_stage("history", save_turn, session_id, question, answer)
+    if cacheable:
+        await run_stage("answer_cache", store_answer, question, output_language, answer)
+
+
+async def generate_answer(
+    question: str,
+    input_language: str,
+    output_language: str,
+    session_id: str,
+) -> tuple[str, int]:
+    """
+    Answer one conversational turn. Cache, history and retrieval run as
+    their own stages; only the model call holds an "llm" slot.
+    Returns (answer, number of LLM calls made) — 0 on an answer-cache hit.
+    """
+    cacheable, answer = await check_answer_cache(question, output_language, session_id)
+    if answer is not None:
+        return answer, 0
+
+    inputs = await answer_inputs(question, input_language, output_language, session_id)
+    result = await run_stage("llm", get_answer_chain().invoke, inputs)
+    await remember(question, output_language, session_id, result.content, cacheable)
+    return result.content, 1
+
+
+def audio_payload(audio: bytes | None, audio_format: str) -> dict:
+    """
+    Attach synthesized audio to a response: inline base64 (default), or,
+    with audio_format="url", a short-lived /audio/{id} link the client
+    fetches as binary — no base64 inflation or extra encode/decode.
+    """
+    if audio is None:
+        return {"audio_base64": None, "audio_url": None}
+    if audio_format == "url":
+        return {"audio_base64": None, "audio_url": f"/audio/{audio_store.put(audio)}"}
+    return {"audio_base64": base64.b64encode(audio).decode("utf-8"), "audio_url": None}
+
+
+async def answer_question(
+    question: str,
+    session_id: str,
+    input_lang: str | None,
+    output_lang: str | None,
+    audio_format: str = "base64",
+) -> dict:
+    """
+    Shared text pipeline for both endpoints:
+    language detection → RAG (in the output language) → TTS.
+    """
+    with stage("detect_language"):
+        detected_lang = detect_language(question)
+    input_language = input_lang or detected_lang
+    final_output_lang = output_lang or input_language
+
+    response, llm_calls = await generate_answer(
+        question, input_language, final_output_lang, session_id
+    )
+
+    # Fallback: translate only if the model ignored the requested language
+    if final_output_lang != input_language and not matches_language(response, final_output_lang):
+        response, translate_calls = await run_stage("translate", translate_text, response, final_output_lang)
+        llm_calls += translate_calls
+
+    audio = None
+    try:
+        audio = await run_stage("tts", synthesize_speech, response, final_output_lang)
+    except Exception as e:
+        print(f"[TTS ERROR] {e}")
+
+    return {
+        "input_language": input_language,
+        "output_language": final_output_lang,
+        "response_text": response,
+        **audio_payload(audio, audio_format),
+        "llm_calls": llm_calls,
+        "prompt_tokens": prompt_tokens(),
+    }
 
 
 # ===============================
@@ -49,6 +350,7 @@ async def ask_text(
     session_id: str = None,
     output_lang: str = None,
     input_lang: str = None,
+    audio_format: str = "base64",
 ):
     # ✅ FIXED: Sanitize "None" strings from Streamlit query params
     output_lang = sanitize_lang(output_lang)
@@ -61,35 +363,201 @@ async def ask_text(
         return {"error": "Question is empty"}
 
     try:
-        detected_lang = detect_language(question)
-        input_language = input_lang or detected_lang
+        result = await answer_question(question, session_id, input_lang, output_lang, audio_format)
+        return {"session_id": session_id, **result}
+
+    except Exception:
+        print("\n===== TEXT ENDPOINT ERROR =====")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail="Text processing failed")
 
-        response = invoke_chain(question, input_language, session_id)
 
-        final_output_lang = output_lang or input_language
+# ===============================
+# STREAMING TEXT QUERY
+# ===============================
+def stream_tokens(inputs: dict, loop, queue) -> str:
+    """
+    Stream the answer chain from a worker thread, handing each token
+    back to the event loop through `queue`. Returns the full answer.
+    """
+    tokens = []
+    for chunk in get_answer_chain().stream(inputs):
+        if chunk.content:
+            tokens.append(chunk.content)
+            loop.call_soon_threadsafe(queue.put_nowait, ("token", chunk.content))
+    return "".join(tokens)
 
-        # Translate only when output language differs from input
-        if final_output_lang != input_language:
-            response = translate_text(response, final_output_lang)
 
-        audio_base64 = None
+async def stream_answer(
+    question: str,
+    session_id: str,
+    input_lang: str | None,
+    output_lang: str | None,
+    audio_format: str = "base64",
+):
+    """
+    SSE generator: emits `token` events as the LLM produces them and an
+    `audio` event per sentence, synthesized as soon as that sentence is
+    complete. Audio events are always emitted in sentence order.
+
+    If the model ignored the requested output language, a `translation`
+    event carries the translated answer once generation ends; audio not
+    yet sent for the original is dropped, and the translation's sentences
+    follow as further `audio` events.
+    """
+    with stage("detect_language"):
+        detected_lang = detect_language(question)
+    input_language = input_lang or detected_lang
+    final_output_lang = output_lang or input_language
+
+    yield sse_event("meta", {
+        "session_id": session_id,
+        "input_language": input_language,
+        "output_language": final_output_lang,
+    })
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    buffer = SentenceBuffer()
+    tokens: list[str] = []
+    sentences: list[str] = []
+    tts_tasks: list[asyncio.Task] = []
+    ready: dict[int, tuple[str, bytes | None] | None] = {}
+    dropped: set[int] = set()
+    next_audio = 0
+    llm_done = False
+    llm_calls = 0
+    translation = None
+
+    async def synthesize(index: int, sentence: str) -> None:
+        audio = None
         try:
-            audio_base64 = text_to_speech(response, final_output_lang)
+            audio = await run_stage("tts", synthesize_speech, sentence, final_output_lang)
         except Exception as e:
             print(f"[TTS ERROR] {e}")
+        queue.put_nowait(("audio", (index, sentence, audio)))
 
-        return {
-            "session_id": session_id,
-            "input_language": input_language,
-            "output_language": final_output_lang,
-            "response_text": response,
-            "audio_base64": audio_base64,
-        }
+    def start_sentence(sentence: str) -> None:
+        tts_tasks.append(asyncio.create_task(synthesize(len(sentences), sentence)))
+        sentences.append(sentence)
+
+    async def produce() -> None:
+        """Feed `queue` with tokens, then an `end` message carrying the LLM call count."""
+        try:
+            cacheable, answer = await check_answer_cache(question, final_output_lang, session_id)
+            if answer is not None:
+                # Cached answers are sent as a single token
+                queue.put_nowait(("token", answer))
+                queue.put_nowait(("end", 0))
+                return
+
+            inputs = await answer_inputs(question, input_language, final_output_lang, session_id)
+            async with _stage_semaphores["llm"]:
+                with stage("llm"):
+                    answer = await asyncio.to_thread(stream_tokens, inputs, loop, queue)
+            await remember(question, final_output_lang, session_id, answer, cacheable)
+
+            # Fallback: translate only if the model ignored the requested language
+            llm_calls = 1
+            if final_output_lang != input_language and not matches_language(answer, final_output_lang):
+                translated, translate_calls = await run_stage("translate", translate_text, answer, final_output_lang)
+                queue.put_nowait(("translation", translated))
+                llm_calls += translate_calls
+            queue.put_nowait(("end", llm_calls))
+
+        except Exception as e:
+            queue.put_nowait(("error", e))
+
+    producer = asyncio.create_task(produce())
+
+    try:
+        while not llm_done or next_audio < len(sentences):
+            kind, payload = await queue.get()
+
+            if kind == "token":
+                tokens.append(payload)
+                yield sse_event("token", {"text": payload})
+                for sentence in buffer.feed(payload):
+                    start_sentence(sentence)
+
+            elif kind == "translation":
+                translation = payload
+                # Original sentences still waiting for audio are not voiced
+                for index in range(next_audio, len(sentences)):
+                    tts_tasks[index].cancel()
+                    dropped.add(index)
+                    ready[index] = None
+                buffer = SentenceBuffer()
+                yield sse_event("translation", {"text": translation})
+                for sentence in buffer.feed(translation):
+                    start_sentence(sentence)
+
+            elif kind == "end":
+                llm_done = True
+                llm_calls = payload
+                tail = buffer.flush()
+                if tail:
+                    start_sentence(tail)
+
+            elif kind == "error":
+                raise payload
+
+            elif kind == "audio":
+                index, text, audio = payload
+                if index not in dropped:
+                    ready[index] = (text, audio)
+
+            while next_audio in ready:
+                entry = ready.pop(next_audio)
+                if entry is not None:
+                    text, audio = entry
+                    yield sse_event("audio", {
+                        "index": next_audio,
+                        "text": text,
+                        **audio_payload(audio, audio_format),
+                    })
+                next_audio += 1
+
+        yield sse_event("done", {
+            "response_text": translation or "".join(tokens),
+            "llm_calls": llm_calls,
+            "prompt_tokens": prompt_tokens(),
+        })
 
     except Exception:
-        print("\n===== TEXT ENDPOINT ERROR =====")
+        print("\n===== STREAM ENDPOINT ERROR =====")
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail="Text processing failed")
+        yield sse_event("error", {"detail": "Text processing failed"})
+
+    finally:
+        # Client went away or something failed — don't leave TTS work running
+        for task in tts_tasks:
+            task.cancel()
+        producer.cancel()
+
+
+@app.post("/ask-text-stream")
+async def ask_text_stream(
+    question: str,
+    session_id: str = None,
+    output_lang: str = None,
+    input_lang: str = None,
+    audio_format: str = "base64",
+):
+    output_lang = sanitize_lang(output_lang)
+    input_lang = sanitize_lang(input_lang)
+
+    if not session_id:
+        session_id = str(uuid.uuid4())
+
+    if not question or not question.strip():
+        return {"error": "Question is empty"}
+
+    return StreamingResponse(
+        stream_answer(question, session_id, input_lang, output_lang, audio_format),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # ===============================
@@ -101,6 +569,7 @@ async def ask_voice(
     session_id: str = None,
     output_lang: str = None,
     input_lang: str = None,
+    audio_format: str = "base64",
 ):
     # ✅ FIXED: Sanitize "None" strings from Streamlit query params
     output_lang = sanitize_lang(output_lang)
@@ -112,66 +581,307 @@ async def ask_voice(
     if not file:
         return {"error": "No audio file received"}
 
-    # ✅ FIXED: Use tempfile.NamedTemporaryFile instead of a relative-path UUID file
-    # This avoids polluting the working directory and is cleaned up safely in finally block
-    tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-    temp_path = tmp.name
-    tmp.close()
+    # Reject oversized uploads from the declared size before reading anything
+    if file.size is not None and file.size > MAX_AUDIO_BYTES:
+        raise HTTPException(status_code=413, detail="Audio file too large")
+
+    no_speech = {
+        "error": "No speech detected",
+        "transcribed_text": "",
+        "response_text": "",
+        "audio_base64": None,
+        "audio_url": None,
+    }
 
     try:
-        # Save uploaded audio to temp file
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Audio stays in memory end to end — no temp file, no second read from disk
+        audio_bytes = await asyncio.to_thread(read_limited, file.file)
+
+        # Local VAD: trim silence, downsample, and drop noise-only or
+        # too-short clips before they reach the STT API
+        with stage("vad"):
+            audio_bytes, rejected = await asyncio.to_thread(prepare_for_stt, audio_bytes)
+        if rejected:
+            return no_speech
 
         # Speech → Text
-        transcribed_text = speech_to_text(temp_path)
+        transcribed_text = await run_stage("stt", speech_to_text, audio_bytes)
 
         if not transcribed_text:
-            return {
-                "error": "No speech detected",
-                "transcribed_text": "",
-                "response_text": "",
-                "audio_base64": None,
-            }
+            return no_speech
+
+        result = await answer_question(
+            transcribed_text, session_id, input_lang, output_lang, audio_format
+        )
+
+        return {
+            "session_id": session_id,
+            "transcribed_text": transcribed_text,
+            **result,
+        }
+
+    except AudioTooLarge:
+        raise HTTPException(status_code=413, detail="Audio file too large")
+
+    except Exception:
+        print("\n===== VOICE ENDPOINT ERROR =====")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail="Voice processing failed")
+
+
+# ===============================
+# BATCH QUERY
+# ===============================
+# Bulk jobs (whole worksheets) answer independent questions: no session
+# history, one embedding pass and one search query for the whole batch,
+# and a bounded number of LLM calls in flight at a time.
+MAX_BATCH_QUESTIONS = int(os.getenv("MAX_BATCH_QUESTIONS", "500"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+BATCH_RETRIES = int(os.getenv("BATCH_RETRIES", "4"))
+BATCH_RETRY_BACKOFF = 1.0  # seconds, doubled after every rate-limited attempt
+
 
-        detected_lang = detect_language(transcribed_text)
-        input_language = input_lang or detected_lang
+class BatchItem(BaseModel):
+    question: str
+    id: str | None = None
+    input_lang: str | None = None
+    output_lang: str | None = None
 
-        # RAG → Response
-        response = invoke_chain(transcribed_text, input_language, session_id)
 
-        final_output_lang = output_lang or input_language
+class BatchRequest(BaseModel):
+    questions: list[BatchItem | str]
+    output_lang: str | None = None
+    tts: bool = False
+    audio_format: str = "base64"
 
-        # Translate if needed
-        if final_output_lang != input_language:
-            response = translate_text(response, final_output_lang)
 
-        audio_base64 = None
+class RateLimitGate:
+    """
+    Shared pause after Groq answers 429: every batch item waits it out
+    instead of each one hammering the API with its own retries.
+    """
+
+    def __init__(self):
+        self.resume_at = 0.0
+
+    async def wait(self) -> None:
+        delay = self.resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+
+groq_gate = RateLimitGate()
+
+
+def retry_after(error: Exception) -> float | None:
+    """Retry-After seconds from a rate-limit error's response, if present."""
+    try:
+        return float(error.response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+async def generate_with_backoff(inputs: dict) -> str:
+    """One answer-chain call; 429s pause all batch work and retry with backoff."""
+    for attempt in range(BATCH_RETRIES + 1):
+        await groq_gate.wait()
         try:
-            audio_base64 = text_to_speech(response, final_output_lang)
+            result = await run_stage("llm", get_answer_chain().invoke, inputs)
+            return result.content
         except Exception as e:
-            print(f"[TTS ERROR] {e}")
+            if getattr(e, "status_code", None) != 429 or attempt == BATCH_RETRIES:
+                raise
+            delay = retry_after(e) or BATCH_RETRY_BACKOFF * 2 ** attempt
+            print(f"[BATCH] rate limited, pausing {delay:.1f}s (attempt {attempt + 1}/{BATCH_RETRIES})")
+            groq_gate.pause(delay * random.uniform(1.0, 1.25))
+
+
+async def answer_batch_item(
+    index: int,
+    item: BatchItem,
+    context: str,
+    batch: BatchRequest,
+    slots: asyncio.Semaphore,
+) -> dict:
+    input_language = sanitize_lang(item.input_lang) or detect_language(item.question)
+    output_language = sanitize_lang(item.output_lang) or sanitize_lang(batch.output_lang) or input_language
+    result = {"index": index, "id": item.id, "question": item.question}
+
+    try:
+        async with slots:
+            # First use loads the embedding model; keep it off the event loop
+            response = await asyncio.to_thread(lookup_answer, item.question, output_language)
+            llm_calls = 0
+            if response is None:
+                response = await generate_with_backoff(answer_input(
+                    item.question,
+                    get_language_name(input_language),
+                    get_language_name(output_language),
+                    context,
+                ))
+                llm_calls = 1
+                if output_language != input_language and not matches_language(response, output_language):
+                    response, translate_calls = await run_stage(
+                        "translate", translate_text, response, output_language
+                    )
+                    llm_calls += translate_calls
+                # Pre-generated answers serve later interactive traffic from the cache
+                await asyncio.to_thread(store_answer, item.question, output_language, response)
+
+        audio = None
+        if batch.tts:
+            try:
+                audio = await run_stage("tts", synthesize_speech, response, output_language)
+            except Exception as e:
+                print(f"[TTS ERROR] {e}")
 
         return {
-            "session_id": session_id,
-            "transcribed_text": transcribed_text,
+            **result,
             "input_language": input_language,
-            "output_language": final_output_lang,
+            "output_language": output_language,
             "response_text": response,
-            "audio_base64": audio_base64,
+            **audio_payload(audio, batch.audio_format),
+            "llm_calls": llm_calls,
         }
 
+    except Exception as e:
+        print(f"[BATCH ERROR] item {index}: {e}")
+        return {**result, "error": str(e)}
+
+
+async def stream_batch(batch: BatchRequest):
+    """NDJSON generator: one line per question as it completes, then a summary line."""
+    start = time.perf_counter()
+    items = [BatchItem(question=q) if isinstance(q, str) else q for q in batch.questions]
+    tasks: list[asyncio.Task] = []
+    errors = 0
+    llm_calls = 0
+
+    try:
+        contexts = await asyncio.to_thread(retrieve_contexts, [item.question for item in items])
+        slots = asyncio.Semaphore(BATCH_LLM_CONCURRENCY)
+        tasks = [
+            asyncio.create_task(answer_batch_item(i, item, context, batch, slots))
+            for i, (item, context) in enumerate(zip(items, contexts))
+        ]
+
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            errors += "error" in result
+            llm_calls += result.get("llm_calls", 0)
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+        yield json.dumps({
+            "done": True,
+            "items": len(items),
+            "errors": errors,
+            "llm_calls": llm_calls,
+            "prompt_tokens": prompt_tokens(),
+            "seconds": round(time.perf_counter() - start, 2),
+        }) + "\n"
+
     except Exception:
-        print("\n===== VOICE ENDPOINT ERROR =====")
+        print("\n===== BATCH ENDPOINT ERROR =====")
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail="Voice processing failed")
+        yield json.dumps({"done": True, "error": "Batch processing failed"}) + "\n"
 
     finally:
-        # Always clean up the temp file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        for task in tasks:
+            task.cancel()
+
+
+@app.post("/ask-batch")
+async def ask_batch(batch: BatchRequest):
+    items = [q if isinstance(q, str) else q.question for q in batch.questions]
+    if not items or any(not q.strip() for q in items):
+        raise HTTPException(status_code=400, detail="Questions must be non-empty")
+    if len(items) > MAX_BATCH_QUESTIONS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {MAX_BATCH_QUESTIONS} questions per batch",
+        )
+
+    return StreamingResponse(stream_batch(batch), media_type="application/x-ndjson")
+
+
+# ===============================
+# BINARY AUDIO
+# ===============================
+@app.get("/audio/{audio_id}")
+async def get_audio(audio_id: str, request: Request):
+    """Serve a synthesized answer as raw MP3, with HTTP range support."""
+    audio = audio_store.get(audio_id)
+    if audio is None:
+        raise HTTPException(status_code=404, detail="Audio not found or expired")
+
+    size = len(audio)
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": "private, max-age=600"}
+
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except ValueError:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        return Response(content=audio, media_type="audio/mpeg", headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return Response(
+        content=audio[start:end + 1],
+        status_code=206,
+        media_type="audio/mpeg",
+        headers=headers,
+    )
+
+
+# ===============================
+# HEALTH
+# ===============================
+@app.get("/health/live")
+async def health_live():
+    """The process is up and serving HTTP."""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """Ready once the model, chain and database have been warmed up."""
+    status_code = 200 if warmup_state["ready"] else 503
+    return JSONResponse(status_code=status_code, content=warmup_state)
+
+
+# ===============================
+# METRICS
+# ===============================
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+# ===============================
+# CACHE STATS
+# ===============================
+@app.get("/stats")
+async def stats():
+    # Don't force a model load just to report stats
+    warm = warmup_state["ready"]
+    return {
+        "answer_cache": get_answer_cache().stats() if warm else None,
+        "query_embedder": get_query_embedder().stats() if warm else None,
+        "tts_cache": tts_cache.stats(),
+        "translation_memory": translation_stats.as_dict(),
+        "audio_vad": vad_stats.as_dict(),
+        "audio_store": audio_store.stats(),
+        "db_pool": pool_stats(),
+    }
 
 
 if __name__ == "__main__":
+    # Single worker for development; python -m src.serve runs several
     import uvicorn
     uvicorn.run("src.app:app", host="0.0.0.0", port=8000, reload=False)
\ No newline at end of file
@@ -0,0 +1,185 @@
+# src/audio.py
+
+import io
+import os
+import wave
+import threading
+
+import numpy as np
+
+# Uploads larger than this are rejected before they are read into memory
+MAX_AUDIO_BYTES = int(os.getenv("MAX_AUDIO_BYTES", str(10 * 1024 * 1024)))
+
+# Cheap local checks that run before paying for an STT call
+MIN_SPEECH_SECONDS = float(os.getenv("MIN_SPEECH_SECONDS", "0.5"))
+SILENCE_RMS = float(os.getenv("SILENCE_RMS", "0.01"))  # full scale = 1.0
+
+UPLOAD_CHUNK = 64 * 1024
+
+
+class AudioTooLarge(Exception):
+    pass
+
+
+def read_limited(stream, limit: int = MAX_AUDIO_BYTES) -> bytes:
+    """Read a file-like object into memory, refusing anything over `limit` bytes."""
+    buffer = bytearray()
+    while chunk := stream.read(UPLOAD_CHUNK):
+        buffer += chunk
+        if len(buffer) > limit:
+            raise AudioTooLarge(f"Audio exceeds {limit} bytes")
+    return bytes(buffer)
+
+
+def decode_wav(data: bytes) -> tuple[np.ndarray, int] | None:
+    """
+    Decode 16-bit PCM WAV into mono float32 samples in [-1, 1].
+    Returns None for anything else (compressed formats are passed to STT as-is).
+    """
+    try:
+        with wave.open(io.BytesIO(data)) as wav:
+            if wav.getsampwidth() != 2:
+                return None
+            channels = wav.getnchannels()
+            rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+# ============================================================
+# VOICE ACTIVITY DETECTION
+# ============================================================
+# Energy-based VAD over fixed frames. The threshold adapts to the clip's
+# noise floor, so a noisy room doesn't count as speech. It is capped at a
+# fraction of the loudest frame: in a clip without pauses the "noise floor"
+# is speech too, and the uncapped threshold would reject all of it.
+FRAME_MS = 30
+VAD_NOISE_RATIO = float(os.getenv("VAD_NOISE_RATIO", "3.0"))
+VAD_PEAK_RATIO = float(os.getenv("VAD_PEAK_RATIO", "0.3"))
+VAD_PADDING_MS = 200  # kept around speech so word onsets aren't clipped
+STT_SAMPLE_RATE = 16000  # Scribe doesn't gain anything above 16 kHz mono
+
+
+class VadStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clips = 0
+        self.rejected: dict[str, int] = {}
+        self.seconds_in = 0.0
+        self.seconds_trimmed = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record(self, seconds_in=0.0, seconds_out=0.0, bytes_in=0, bytes_out=0, rejected=None):
+        with self._lock:
+            self.clips += 1
+            self.seconds_in += seconds_in
+            self.seconds_trimmed += max(seconds_in - seconds_out, 0.0)
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            if rejected:
+                self.rejected[rejected] = self.rejected.get(rejected, 0) + 1
+
+    def as_dict(self) -> dict:
+        return {
+            "clips": self.clips,
+            "rejected": dict(self.rejected),
+            "seconds_in": round(self.seconds_in, 2),
+            "seconds_trimmed": round(self.seconds_trimmed, 2),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+
+vad_stats = VadStats()
+
+
+def speech_mask(samples: np.ndarray, rate: int) -> np.ndarray:
+    """Boolean speech/non-speech decision per FRAME_MS frame."""
+    frame = int(rate * FRAME_MS / 1000)
+    n_frames = len(samples) // frame
+    frames = samples[: n_frames * frame].reshape(n_frames, frame)
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+
+    noise_floor = np.percentile(energy, 10)
+    adaptive = min(noise_floor * VAD_NOISE_RATIO, energy.max() * VAD_PEAK_RATIO)
+    return energy > max(SILENCE_RMS, adaptive)
+
+
+def pad_mask(mask: np.ndarray) -> np.ndarray:
+    """Hangover: extend each speech frame by the padding on both sides."""
+    pad = int(VAD_PADDING_MS / FRAME_MS)
+    if pad and mask.any():
+        return np.convolve(mask, np.ones(2 * pad + 1), mode="same") > 0
+    return mask
+
+
+def resample(samples: np.ndarray, rate: int, target: int = STT_SAMPLE_RATE) -> np.ndarray:
+    """Downsample to `target` Hz (box-filtered to limit aliasing)."""
+    if rate <= target:
+        return samples
+    ratio = rate / target
+    if ratio.is_integer():
+        step = int(ratio)
+        return samples[: len(samples) // step * step].reshape(-1, step).mean(axis=1)
+
+    width = int(np.ceil(ratio))
+    smoothed = np.convolve(samples, np.ones(width) / width, mode="same")
+    positions = np.arange(0, len(samples) - 1, ratio)
+    return np.interp(positions, np.arange(len(samples)), smoothed).astype(np.float32)
+
+
+def encode_wav(samples: np.ndarray, rate: int) -> bytes:
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def prepare_for_stt(data: bytes) -> tuple[bytes | None, str | None]:
+    """
+    Trim leading/trailing silence and downsample a WAV clip for STT.
+
+    Returns (audio, None) when the clip should be transcribed, or
+    (None, reason) when it can be rejected locally. Non-WAV input is
+    returned unchanged.
+    """
+    decoded = decode_wav(data)
+    if decoded is None:
+        return data, None
+
+    samples, rate = decoded
+    seconds_in = len(samples) / rate
+
+    if seconds_in < MIN_SPEECH_SECONDS:
+        vad_stats.record(seconds_in, bytes_in=len(data), rejected="too_short")
+        return None, "too_short"
+
+    mask = speech_mask(samples, rate)
+    if not mask.any():
+        vad_stats.record(seconds_in, bytes_in=len(data), rejected="silent")
+        return None, "silent"
+
+    # Speech is measured on the raw frames; padding only widens the cut
+    if mask.sum() * FRAME_MS / 1000 < MIN_SPEECH_SECONDS:
+        vad_stats.record(seconds_in, bytes_in=len(data), rejected="too_short")
+        return None, "too_short"
+
+    frame = int(rate * FRAME_MS / 1000)
+    voiced = np.flatnonzero(pad_mask(mask))
+    trimmed = samples[voiced[0] * frame : (voiced[-1] + 1) * frame]
+
+    out_rate = min(rate, STT_SAMPLE_RATE)
+    audio = encode_wav(resample(trimmed, rate, out_rate), out_rate)
+    vad_stats.record(seconds_in, len(trimmed) / rate, len(data), len(audio))
+    return audio, None
@@ -0,0 +1,76 @@
+# src/audio_store.py
+
+import os
+import re
+import uuid
+
+from .cache import LRUCache, SqliteStore, TieredCache
+
+# Synthesized answers are kept just long enough for the client to fetch them
+AUDIO_STORE_TTL = float(os.getenv("AUDIO_STORE_TTL", "600"))
+AUDIO_STORE_MAX_BYTES = int(os.getenv("AUDIO_STORE_MAX_BYTES", str(128 * 1024 * 1024)))
+# With several workers the /audio/{id} request may land on another process,
+# so clips must also go to a shared file (src/serve.py sets this)
+AUDIO_STORE_PATH = os.getenv("AUDIO_STORE_PATH", "")
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class AudioStore:
+    """Short-lived, size-bounded store of MP3 clips served from /audio/{id}."""
+
+    def __init__(
+        self,
+        ttl: float = AUDIO_STORE_TTL,
+        max_bytes: int = AUDIO_STORE_MAX_BYTES,
+        path: str = AUDIO_STORE_PATH,
+    ):
+        self._clips = TieredCache(
+            LRUCache(max_bytes=max_bytes, ttl=ttl),
+            SqliteStore(path, table="audio_clips", ttl=ttl) if path else None,
+        )
+
+    def put(self, audio: bytes) -> str:
+        audio_id = uuid.uuid4().hex
+        self._clips.set(audio_id, audio)
+        return audio_id
+
+    def get(self, audio_id: str) -> bytes | None:
+        return self._clips.get(audio_id)
+
+    def stats(self) -> dict:
+        return self._clips.stats()
+
+
+audio_store = AudioStore()
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single `Range: bytes=start-end` header into an inclusive
+    (start, end) pair. Returns None when the whole clip should be sent;
+    raises ValueError when the range can't be satisfied.
+    """
+    if not header:
+        return None
+
+    match = _RANGE.match(header.strip())
+    if not match:
+        return None  # multi-range or malformed — fall back to a full response
+
+    start, end = match.groups()
+    if start == "" and end == "":
+        return None
+
+    if start == "":
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+
+    first = int(start)
+    last = min(int(end), size - 1) if end else size - 1
+    if first >= size or first > last:
+        raise ValueError("range not satisfiable")
+    return first, last
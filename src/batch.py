@@ -0,0 +1,86 @@
+# src/batch.py
+"""
+Answer a whole worksheet through the /ask-batch endpoint.
+
+    python -m src.batch worksheet.txt -o answers.ndjson
+    python -m src.batch worksheet.jsonl --output-lang ta --tts
+
+Input is one question per line (.txt), or JSON lines / a JSON list of
+{"question": ..., "id": ..., "input_lang": ..., "output_lang": ...}
+objects (.jsonl / .json). Answers are written as NDJSON, one line per
+question in completion order, as soon as the server finishes each one.
+Large worksheets are sent in several batches.
+"""
+
+import sys
+import json
+import argparse
+
+import requests
+
+
+def load_questions(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        return [line.strip() for line in f if line.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Answer a worksheet of questions in bulk.")
+    parser.add_argument("worksheet", help=".txt (one question per line), .jsonl or .json")
+    parser.add_argument("-o", "--output", help="NDJSON output file (default: stdout)")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--output-lang", choices=["en", "ta", "hi"])
+    parser.add_argument("--tts", action="store_true", help="Also synthesize audio")
+    parser.add_argument("--audio-format", default="base64", choices=["base64", "url"])
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    args = parser.parse_args()
+
+    questions = load_questions(args.worksheet)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    done = errors = 0
+
+    try:
+        for offset in range(0, len(questions), args.batch_size):
+            response = requests.post(
+                f"{args.url}/ask-batch",
+                json={
+                    "questions": questions[offset:offset + args.batch_size],
+                    "output_lang": args.output_lang,
+                    "tts": args.tts,
+                    "audio_format": args.audio_format,
+                },
+                stream=True,
+                timeout=args.timeout,
+            )
+            response.raise_for_status()
+
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                result = json.loads(line)
+                if result.get("done"):
+                    if "error" in result:
+                        sys.exit(f"❌ batch at {offset} failed: {result['error']}")
+                    continue
+
+                # Indexes are per batch; make them worksheet positions
+                result["index"] += offset
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                done += 1
+                errors += "error" in result
+                print(f"\r{done}/{len(questions)} answered, {errors} failed", end="", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
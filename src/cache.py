@@ -0,0 +1,271 @@
+# src/cache.py
+
+import os
+import time
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFC, collapsed whitespace."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU cache.
+
+    Bounded by total size (as measured by `sizeof`) and/or entry count,
+    with an optional per-entry TTL in seconds.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int | None = None,
+        max_items: int | None = None,
+        ttl: float | None = None,
+        sizeof: Callable[[Any], int] = len,
+    ):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.ttl = ttl
+        self.sizeof = sizeof
+
+        self._data: OrderedDict[str, tuple[Any, int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, stored_at = entry
+            if self._expired(stored_at, time.monotonic()):
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        size = self.sizeof(value)
+
+        # Never let a single oversized value flush the whole cache
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+            self._data[key] = (value, size, time.monotonic())
+            self.bytes += size
+
+            # Expired entries go first, wherever they sit in LRU order
+            if self._over_budget():
+                self._purge_expired()
+            while self._over_budget():
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def items(self) -> list[tuple[str, Any]]:
+        """Snapshot of live entries, oldest first."""
+        with self._lock:
+            self._purge_expired()
+            return [(key, value) for key, (value, _, _) in self._data.items()]
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def _purge_expired(self) -> None:
+        if self.ttl is None:
+            return
+        now = time.monotonic()
+        for key in [k for k, (_, _, stored_at) in self._data.items() if self._expired(stored_at, now)]:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._data.pop(key)
+        self.bytes -= size
+
+    def _over_budget(self) -> bool:
+        if self.max_bytes is not None and self.bytes > self.max_bytes:
+            return True
+        if self.max_items is not None and len(self._data) > self.max_items:
+            return True
+        return False
+
+
+class SqliteStore:
+    """
+    Persistent key → bytes store backed by a single SQLite table.
+    WAL mode lets several worker processes share the same file.
+
+    With a `ttl`, older rows are invisible to reads and purged now and then.
+    With `max_bytes`, the oldest-written rows are evicted once the stored
+    values exceed it, checked after every tenth of `max_bytes` written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "cache",
+        ttl: float | None = None,
+        max_bytes: int | None = None,
+    ):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._last_purge = time.time()
+        self._written = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _oldest(self) -> float:
+        """created_at cut-off for live rows."""
+        return time.time() - self.ttl if self.ttl is not None else 0.0
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value FROM {self.table} WHERE key = ? AND created_at >= ?",
+                (key, self._oldest()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            if self.ttl is not None and time.time() - self._last_purge > self.ttl / 10:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE created_at < ?", (self._oldest(),)
+                )
+                self._last_purge = time.time()
+            self._written += len(value)
+            if self.max_bytes is not None and self._written > self.max_bytes / 10:
+                self._evict_oldest()
+                self._written = 0
+            self._conn.commit()
+
+    def _evict_oldest(self) -> None:
+        """Keep the newest rows whose values fit in max_bytes."""
+        self._conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            "  SELECT key FROM ("
+            "    SELECT key, SUM(length(value)) OVER (ORDER BY created_at DESC, rowid DESC) AS total "
+            f"    FROM {self.table}"
+            "  ) WHERE total > ?"
+            ")",
+            (self.max_bytes,),
+        )
+
+    def since(self, rowid: int) -> list[tuple[int, str, bytes]]:
+        """Live rows written after `rowid`, oldest first, as (rowid, key, value)."""
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT rowid, key, value FROM {self.table} "
+                "WHERE rowid > ? AND created_at >= ? ORDER BY rowid",
+                (rowid, self._oldest()),
+            ).fetchall()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class TieredCache:
+    """
+    Memory LRU in front of an optional persistent store.
+    Disk hits are promoted into memory.
+    """
+
+    def __init__(self, memory: LRUCache, disk: SqliteStore | None = None):
+        self.memory = memory
+        self.disk = disk
+        self.disk_hits = 0
+
+    def get(self, key: str) -> bytes | None:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        if self.disk is None:
+            return None
+
+        value = self.disk.get(key)
+        if value is not None:
+            self.disk_hits += 1
+            self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def stats(self) -> dict:
+        memory = self.memory.stats()
+        hits = memory["hits"] + self.disk_hits
+        lookups = memory["hits"] + memory["misses"]
+        return {
+            "memory_entries": memory["entries"],
+            "memory_bytes": memory["bytes"],
+            "memory_hits": memory["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": memory["misses"] - self.disk_hits,
+            "evictions": memory["evictions"],
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
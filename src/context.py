@@ -0,0 +1,121 @@
+# src/context.py
+"""
+Context packing for the RAG prompt.
+
+Retrieved chunks overlap (the splitter repeats CHUNK_OVERLAP characters
+between neighbours) and often say the same thing twice. Before they go
+into the prompt, overlapping chunks are stitched together, near-duplicates
+are dropped, and the result is cut to CONTEXT_TOKEN_BUDGET tokens.
+"""
+
+import os
+import re
+
+from .llm import estimate_tokens
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "500"))
+# Share of a chunk's word trigrams already in a kept passage above which
+# the chunk counts as a repeat and is dropped
+DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", "0.8"))
+
+MIN_OVERLAP = 20   # characters; shorter matches are coincidence
+MAX_OVERLAP = 300  # the splitter overlaps by 100, on separator boundaries
+
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s")
+
+
+def overlap(a: str, b: str) -> int:
+    """Length of the longest suffix of `a` that is a prefix of `b`."""
+    for size in range(min(len(a), len(b), MAX_OVERLAP), MIN_OVERLAP - 1, -1):
+        if a.endswith(b[:size]):
+            return size
+    return 0
+
+
+def shingles(text: str) -> set[tuple[str, ...]]:
+    words = text.lower().split()
+    return {tuple(words[i:i + 3]) for i in range(max(len(words) - 2, 1))}
+
+
+def is_duplicate(candidate: set, kept: set) -> bool:
+    if not candidate:
+        return False
+    return len(candidate & kept) / len(candidate) >= DUPLICATE_THRESHOLD
+
+
+def merge_chunks(texts: list[str]) -> list[str]:
+    """
+    Stitch chunks that continue each other (one's tail is the other's
+    head) into a single passage. The passage keeps the rank of its best
+    chunk; order otherwise stays as retrieved.
+    """
+    merged: list[str] = []
+    for text in texts:
+        for i, passage in enumerate(merged):
+            if text in passage:
+                break
+            if (size := overlap(passage, text)):
+                merged[i] = passage + text[size:]
+                break
+            if (size := overlap(text, passage)):
+                merged[i] = text + passage[size:]
+                break
+        else:
+            merged.append(text)
+    return merged
+
+
+def longest_prefix(parts: list[str], budget: int) -> str:
+    """Longest space-joined run of leading `parts` within `budget` tokens."""
+    kept = ""
+    for part in parts:
+        candidate = f"{kept} {part}" if kept else part
+        if estimate_tokens(candidate) > budget:
+            break
+        kept = candidate
+    return kept
+
+
+def trim_to_budget(text: str, budget: int) -> str:
+    """
+    Longest sentence-aligned prefix of `text` within `budget` tokens.
+    Text with no sentence end that fits (bullet lists, headings, a long
+    first sentence) is cut on a word boundary, and a single word longer
+    than the budget mid-word, so a passage never trims down to nothing.
+    """
+    kept = longest_prefix(_SENTENCE_END.split(text), budget)
+    if not kept:
+        kept = longest_prefix(text.split(), budget)
+    if not kept:
+        size = len(text)
+        while size and estimate_tokens(text[:size]) > budget:
+            size //= 2
+        kept = text[:size]
+    return kept
+
+
+def pack_context(docs: list, budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """Merged, de-duplicated chunk text, best first, within `budget` tokens."""
+    passages = merge_chunks([doc.page_content.strip() for doc in docs if doc.page_content.strip()])
+
+    kept: list[str] = []
+    seen: list[set] = []
+    used = 0
+    for passage in passages:
+        grams = shingles(passage)
+        if any(is_duplicate(grams, other) for other in seen):
+            continue
+
+        tokens = estimate_tokens(passage)
+        if used + tokens > budget:
+            # Fill what's left (whole sentences where possible), then stop
+            passage = trim_to_budget(passage, budget - used)
+            if passage:
+                kept.append(passage)
+            break
+
+        kept.append(passage)
+        seen.append(grams)
+        used += tokens
+
+    return "\n\n".join(kept)
@@ -0,0 +1,98 @@
+# src/db.py
+
+import os
+import time
+import threading
+from functools import lru_cache
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from .vector_index import search_engine_args
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# One bounded pool per process, shared by chat history and PGVector
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+
+class PoolMetrics:
+    """Checkout wait-time counters; survives pool re-creation on dispose()."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+
+pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            pool_metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.record(time.perf_counter() - start)
+        return conn
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    assert DATABASE_URL, "DATABASE_URL is not set in .env"
+    return create_engine(
+        DATABASE_URL,
+        poolclass=TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,  # health-check each connection before handing it out
+        **search_engine_args(),
+    )
+
+
+def check_database() -> bool:
+    """Round-trip a trivial query through the pool."""
+    try:
+        with get_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        print(f"[DB ERROR] {e}")
+        return False
+
+
+def pool_stats() -> dict:
+    pool = get_engine().pool
+    checkouts = pool_metrics.checkouts
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checkouts": checkouts,
+        "timeouts": pool_metrics.timeouts,
+        "avg_wait_ms": round(1000 * pool_metrics.total_wait / checkouts, 2) if checkouts else 0.0,
+        "max_wait_ms": round(1000 * pool_metrics.max_wait, 2),
+    }
@@ -0,0 +1,180 @@
+# src/embedding_server.py
+"""
+Embedding sidecar shared by all API workers.
+
+    python -m src.embedding_server --backend onnx-int8
+
+Loads the embedding model once and serves it over a local socket, so N
+workers don't hold N copies of the weights. Single queries from all
+workers go through one QueryEmbedder, which batches and caches them
+across processes. Workers use it with EMBEDDING_BACKEND=remote and send
+queries as-is (rag.get_query_embedder adds no per-worker batching).
+
+Both ends unpickle what they receive, so connections are authenticated
+with EMBEDDING_SERVICE_AUTHKEY. When it is unset, the sidecar generates
+a key and writes it to "<address>.key" (mode 0600), where clients on the
+same host read it; the socket itself is created owner-only too.
+"""
+
+import os
+import secrets
+import argparse
+import threading
+from multiprocessing.connection import Client, Listener
+from queue import Empty, Queue
+
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_SERVICE_ADDRESS = os.getenv("EMBEDDING_SERVICE_ADDRESS", ".cache/embeddings.sock")
+EMBEDDING_SERVICE_AUTHKEY = os.getenv("EMBEDDING_SERVICE_AUTHKEY")
+
+
+def key_path(address: str) -> str:
+    return f"{address}.key"
+
+
+def client_authkey(address: str, authkey: str | None = EMBEDDING_SERVICE_AUTHKEY) -> bytes:
+    """The configured key, else the one the sidecar wrote next to its socket."""
+    if authkey:
+        return authkey.encode()
+    try:
+        with open(key_path(address), encoding="utf-8") as f:
+            return f.read().strip().encode()
+    except FileNotFoundError:
+        raise RuntimeError(
+            f"No key for the embedding sidecar at {address}: set EMBEDDING_SERVICE_AUTHKEY "
+            "or start the sidecar first"
+        ) from None
+
+
+def server_authkey(address: str, authkey: str | None = EMBEDDING_SERVICE_AUTHKEY) -> bytes:
+    """The configured key, else a fresh one written owner-only next to the socket."""
+    if authkey:
+        return authkey.encode()
+    authkey = secrets.token_hex(16)
+    path = key_path(address)
+    if os.path.exists(path):
+        os.remove(path)  # may be someone else's, or readable by others
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(authkey)
+    return authkey.encode()
+
+
+def owner_only_listener(address: str, authkey: bytes) -> Listener:
+    """Listener whose socket file only the current user can connect to."""
+    umask = os.umask(0o177)
+    try:
+        return Listener(address, family="AF_UNIX", authkey=authkey)
+    finally:
+        os.umask(umask)
+
+
+class RemoteEmbeddings(Embeddings):
+    """Client for the sidecar; keeps one connection per concurrent caller."""
+
+    def __init__(
+        self,
+        address: str = EMBEDDING_SERVICE_ADDRESS,
+        authkey: str | None = EMBEDDING_SERVICE_AUTHKEY,
+    ):
+        self.address = address
+        self.authkey = client_authkey(address, authkey)
+        self._idle: Queue = Queue()
+
+    def _call(self, method: str, payload):
+        try:
+            conn = self._idle.get_nowait()
+        except Empty:
+            conn = Client(self.address, family="AF_UNIX", authkey=self.authkey)
+        try:
+            conn.send((method, payload))
+            ok, result = conn.recv()
+        except Exception:
+            conn.close()
+            raise
+        self._idle.put(conn)
+        if not ok:
+            raise RuntimeError(f"embedding sidecar: {result}")
+        return result
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._call("query", text)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._call("documents", texts)
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        return self._call("queries", texts)
+
+    def stats(self) -> dict:
+        """The sidecar's QueryEmbedder stats (shared by all workers)."""
+        return self._call("stats", None)
+
+
+def handle(conn, embedder) -> None:
+    """Serve one worker connection until it closes."""
+    with conn:
+        while True:
+            try:
+                method, payload = conn.recv()
+            except EOFError:
+                return
+            try:
+                if method == "query":
+                    result = embedder.embed_query(payload)
+                elif method == "queries":
+                    result = embedder.embed_queries(payload)
+                elif method == "stats":
+                    result = embedder.stats()
+                else:
+                    result = embedder.embed_documents(payload)
+                conn.send((True, result))
+            except Exception as e:
+                conn.send((False, str(e)))
+
+
+def accept_forever(listener: Listener, embedder) -> None:
+    """Serve each worker connection on its own thread."""
+    while True:
+        try:
+            conn = listener.accept()
+        except Exception as e:  # failed handshake; keep serving
+            print(f"[EMBEDDINGS ERROR] {e}")
+            continue
+        threading.Thread(target=handle, args=(conn, embedder), daemon=True).start()
+
+
+def serve(
+    backend: str,
+    address: str = EMBEDDING_SERVICE_ADDRESS,
+    authkey: str | None = EMBEDDING_SERVICE_AUTHKEY,
+) -> None:
+    from .embedding_service import QueryEmbedder
+    from .models import load_embeddings
+
+    embedder = QueryEmbedder(load_embeddings(backend=backend))
+    embedder.embed_query("warm up")
+
+    os.makedirs(os.path.dirname(os.path.abspath(address)), exist_ok=True)
+    if os.path.exists(address):
+        os.remove(address)  # stale socket from a previous run
+
+    # The socket only appears once the model is loaded, so it doubles as readiness
+    with owner_only_listener(address, server_authkey(address, authkey)) as listener:
+        print(f"[EMBEDDINGS] {backend} serving on {address}")
+        accept_forever(listener, embedder)
+
+
+def main() -> None:
+    from .models import EMBEDDING_BACKENDS
+
+    parser = argparse.ArgumentParser(description="Run the shared embedding sidecar.")
+    parser.add_argument("--backend", choices=sorted(EMBEDDING_BACKENDS), default="torch")
+    parser.add_argument("--address", default=EMBEDDING_SERVICE_ADDRESS)
+    args = parser.parse_args()
+    serve(args.backend, args.address)
+
+
+if __name__ == "__main__":
+    main()
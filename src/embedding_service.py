@@ -0,0 +1,124 @@
+# src/embedding_service.py
+
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+from langchain_core.embeddings import Embeddings
+
+from .cache import LRUCache, normalize_text
+
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "32"))
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "4096"))
+
+
+class QueryEmbedder(Embeddings):
+    """
+    In-process query embedding service.
+
+    Concurrent `embed_query` calls are collected for up to `window_ms` and
+    embedded together in a single `embed_documents` forward pass. Recent
+    query vectors are kept in an LRU, so the answer cache and the retriever
+    share one embedding per question.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        window_ms: float = EMBED_BATCH_WINDOW_MS,
+        max_batch: int = EMBED_MAX_BATCH,
+        cache_size: int = EMBED_CACHE_SIZE,
+    ):
+        self.embeddings = embeddings
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._cache = LRUCache(max_items=cache_size, sizeof=lambda _: 1)
+        self._queue: queue.Queue[tuple[str, Future]] = queue.Queue()
+        self.batches = 0
+        self.embedded = 0
+
+        self._worker = threading.Thread(target=self._run, name="query-embedder", daemon=True)
+        self._worker.start()
+
+    def embed_query(self, text: str) -> list[float]:
+        key = normalize_text(text)
+        vector = self._cache.get(key)
+        if vector is not None:
+            return vector
+
+        future: Future = Future()
+        self._queue.put((key, future))
+        return future.result()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        # Bulk callers (ingestion) already batch; send them straight through
+        return self.embeddings.embed_documents(texts)
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """
+        Many queries at once (batch answering): cached ones are reused, the
+        rest go through one forward pass and are cached like embed_query's.
+        """
+        keys = [normalize_text(text) for text in texts]
+        vectors = {key: self._cache.get(key) for key in keys}
+        missing = [key for key, vector in vectors.items() if vector is None]
+        if missing:
+            for key, vector in zip(missing, self.embeddings.embed_documents(missing)):
+                self._cache.set(key, vector)
+                vectors[key] = vector
+            self.batches += 1
+            self.embedded += len(missing)
+        return [vectors[key] for key in keys]
+
+    def _collect(self) -> list[tuple[str, Future]]:
+        """Block for the first request, then gather more until the window closes."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+
+            # The same question may arrive twice in one window
+            waiting: dict[str, list[Future]] = {}
+            for key, future in batch:
+                waiting.setdefault(key, []).append(future)
+            texts = list(waiting)
+
+            try:
+                vectors = self.embeddings.embed_documents(texts)
+            except Exception as e:
+                for futures in waiting.values():
+                    for future in futures:
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.embedded += len(texts)
+
+            for text, vector in zip(texts, vectors):
+                self._cache.set(text, vector)
+                for future in waiting[text]:
+                    future.set_result(vector)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "embedded": self.embedded,
+            "avg_batch_size": round(self.embedded / self.batches, 2) if self.batches else 0.0,
+            "cache": self._cache.stats(),
+        }
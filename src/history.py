@@ -0,0 +1,232 @@
+# src/history.py
+
+import os
+import json
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import (
+    BaseMessage,
+    SystemMessage,
+    get_buffer_string,
+    message_to_dict,
+    messages_from_dict,
+)
+from sqlalchemy import text
+
+from .db import get_engine
+from .llm import llm, estimate_tokens
+
+HISTORY_TABLE = "chat_history"
+SUMMARY_TABLE = "chat_history_summary"
+
+# Recent turns are sent verbatim up to this many tokens; everything older
+# is folded into a rolling per-session summary.
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1500"))
+HISTORY_FETCH_LIMIT = int(os.getenv("HISTORY_FETCH_LIMIT", "40"))
+SUMMARY_BATCH_LIMIT = 50
+
+# Summaries are computed off the request path, one at a time
+_summarizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-summary")
+_summarizing: set[str] = set()
+_summarizing_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def ensure_history_table(table_name: str = HISTORY_TABLE) -> None:
+    """
+    Create the history tables once per process.
+    Same schema as langchain_community's PostgresChatMessageHistory,
+    so existing history rows keep working.
+    """
+    with get_engine().begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {table_name} ("
+            "id SERIAL PRIMARY KEY, session_id TEXT NOT NULL, message JSONB NOT NULL)"
+        ))
+        # Tail reads are "WHERE session_id = ? ORDER BY id DESC LIMIT n"
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table_name}_session_id "
+            f"ON {table_name} (session_id, id)"
+        ))
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} ("
+            "session_id TEXT PRIMARY KEY, summary TEXT NOT NULL, "
+            "covered_id INTEGER NOT NULL, updated_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        ))
+
+
+def recent_window(rows: list[tuple[int, BaseMessage]], budget: int) -> list[tuple[int, BaseMessage]]:
+    """
+    Newest rows that fit in `budget` tokens (always at least one row before
+    trimming), starting on a human turn so no answer goes without its question.
+    """
+    window: list[tuple[int, BaseMessage]] = []
+    for row_id, message in reversed(rows):
+        budget -= estimate_tokens(message.content)
+        if budget < 0 and window:
+            break
+        window.insert(0, (row_id, message))
+
+    while window and window[0][1].type != "human":
+        window.pop(0)
+    return window
+
+
+def summarize(previous: str, messages: list[BaseMessage]) -> str:
+    """Fold older turns into the running summary with one LLM call."""
+    prompt = f"""
+You maintain a running summary of a tutoring conversation between a student
+and an English tutor. Update the summary with the new turns below.
+Keep the topics covered, the student's language and recurring mistakes.
+Return ONLY the updated summary, at most 120 words.
+
+Current summary:
+{previous or "(none)"}
+
+New turns:
+{get_buffer_string(messages)}
+"""
+    return llm.invoke(prompt).content.strip()
+
+
+class PooledChatMessageHistory(BaseChatMessageHistory):
+    """
+    Postgres chat history that borrows connections from the shared pool.
+
+    Reading `messages` returns a bounded window: the rolling summary of
+    older turns plus the newest turns that fit in HISTORY_TOKEN_BUDGET.
+    Only the tail rows after the summary are fetched.
+    """
+
+    def __init__(self, session_id: str, table_name: str = HISTORY_TABLE):
+        self.session_id = session_id
+        self.table_name = table_name
+        ensure_history_table(table_name)
+
+    # ----- Reads -----
+    def _summary(self, conn) -> tuple[str, int]:
+        row = conn.execute(
+            text(f"SELECT summary, covered_id FROM {SUMMARY_TABLE} WHERE session_id = :sid"),
+            {"sid": self.session_id},
+        ).first()
+        return (row[0], row[1]) if row else ("", 0)
+
+    def _tail(self, conn, after_id: int, limit: int) -> list[tuple[int, BaseMessage]]:
+        """Newest `limit` rows with id > after_id, oldest first."""
+        rows = conn.execute(
+            text(
+                f"SELECT id, message FROM {self.table_name} "
+                "WHERE session_id = :sid AND id > :after ORDER BY id DESC LIMIT :limit"
+            ),
+            {"sid": self.session_id, "after": after_id, "limit": limit},
+        ).all()
+        rows.reverse()
+        return list(zip([r[0] for r in rows], messages_from_dict([r[1] for r in rows])))
+
+    def has_messages(self) -> bool:
+        with get_engine().connect() as conn:
+            return conn.execute(
+                text(f"SELECT EXISTS (SELECT 1 FROM {self.table_name} WHERE session_id = :sid)"),
+                {"sid": self.session_id},
+            ).scalar()
+
+    @property
+    def messages(self) -> list[BaseMessage]:
+        with get_engine().connect() as conn:
+            summary, covered_id = self._summary(conn)
+            tail = self._tail(conn, covered_id, HISTORY_FETCH_LIMIT)
+
+        window = recent_window(tail, HISTORY_TOKEN_BUDGET - estimate_tokens(summary))
+
+        # Rows between the summary and the window (dropped for budget, or
+        # older than the fetched tail) get folded into the summary
+        if len(window) < len(tail) or len(tail) == HISTORY_FETCH_LIMIT:
+            self._schedule_summary(window[0][0] if window else tail[-1][0] + 1)
+
+        messages = [message for _, message in window]
+        if summary:
+            messages.insert(0, SystemMessage(content=f"Summary of the earlier conversation:\n{summary}"))
+        return messages
+
+    # ----- Writes -----
+    def add_messages(self, messages: list[BaseMessage]) -> None:
+        if not messages:
+            return
+        with get_engine().begin() as conn:
+            conn.execute(
+                text(
+                    f"INSERT INTO {self.table_name} (session_id, message) "
+                    "VALUES (:sid, CAST(:message AS jsonb))"
+                ),
+                [
+                    {"sid": self.session_id, "message": json.dumps(message_to_dict(m))}
+                    for m in messages
+                ],
+            )
+
+    def clear(self) -> None:
+        with get_engine().begin() as conn:
+            conn.execute(
+                text(f"DELETE FROM {self.table_name} WHERE session_id = :sid"),
+                {"sid": self.session_id},
+            )
+            conn.execute(
+                text(f"DELETE FROM {SUMMARY_TABLE} WHERE session_id = :sid"),
+                {"sid": self.session_id},
+            )
+
+    # ----- Rolling summary -----
+    def _schedule_summary(self, before_id: int) -> None:
+        with _summarizing_lock:
+            if self.session_id in _summarizing:
+                return
+            _summarizing.add(self.session_id)
+        _summarizer.submit(self._update_summary, before_id)
+
+    def _update_summary(self, before_id: int) -> None:
+        """
+        Fold rows (covered_id, before_id) into the summary, a bounded batch
+        at a time, so each session's summary is computed incrementally.
+        """
+        try:
+            with get_engine().connect() as conn:
+                summary, covered_id = self._summary(conn)
+                rows = conn.execute(
+                    text(
+                        f"SELECT id, message FROM {self.table_name} "
+                        "WHERE session_id = :sid AND id > :after AND id < :before "
+                        "ORDER BY id LIMIT :limit"
+                    ),
+                    {
+                        "sid": self.session_id,
+                        "after": covered_id,
+                        "before": before_id,
+                        "limit": SUMMARY_BATCH_LIMIT,
+                    },
+                ).all()
+
+            if not rows:
+                return
+
+            summary = summarize(summary, messages_from_dict([r[1] for r in rows]))
+
+            with get_engine().begin() as conn:
+                conn.execute(
+                    text(
+                        f"INSERT INTO {SUMMARY_TABLE} (session_id, summary, covered_id) "
+                        "VALUES (:sid, :summary, :covered) "
+                        "ON CONFLICT (session_id) DO UPDATE SET summary = EXCLUDED.summary, "
+                        "covered_id = EXCLUDED.covered_id, updated_at = now()"
+                    ),
+                    {"sid": self.session_id, "summary": summary, "covered": rows[-1][0]},
+                )
+
+        except Exception as e:
+            print(f"[HISTORY SUMMARY ERROR] {e}")
+
+        finally:
+            with _summarizing_lock:
+                _summarizing.discard(self.session_id)
@@ -1,11 +1,47 @@
 # src/ingest.py
+"""
+Ingest a directory of PDFs into PGVector.
 
-from langchain_huggingface import HuggingFaceEmbeddings
+    python -m src.ingest data/ --workers 4 --batch-size 64
+
+Pages are parsed in a process pool and streamed through the splitter,
+embedded in batches and bulk-inserted. Every chunk is stored under a
+content-hash ID and tracked in a manifest, so re-runs only embed new or
+changed chunks, delete chunks that disappeared, and resume after a crash.
+A file is only skipped if all of its chunks are still in the database, so
+a reset or restored database is refilled from the same manifest.
+
+Files are keyed by their path relative to the corpus directory, however
+it is spelled on the command line. The manifest is the source of truth
+for the collection: rows it does not track (such as the random-ID rows of
+earlier ingests) are deleted once a run completes.
+"""
+
+import os
+import json
+import hashlib
+import time
+import argparse
+import multiprocessing
+from itertools import batched
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from langchain_core.documents import Document
 from langchain_postgres import PGVector
-from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
-import os
+
+from .models import load_embeddings
+from .vector_index import (
+    EMBEDDING_DIM,
+    EMBEDDING_TABLE,
+    VECTOR_INDEX_TYPE,
+    create_index,
+    create_text_index,
+    rebuild_index,
+)
 
 load_dotenv()
 
@@ -13,30 +49,332 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 assert DATABASE_URL, "DATABASE_URL is not set in .env"
 
-# ✅ FIXED: Same embedding model used in both ingest.py and rag.py
-# Must match exactly — different models produce incompatible vector dimensions
-embeddings = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-)
+COLLECTION_NAME = "ai_tutor_docs"
 
-vectorstore = PGVector(
-    collection_name="ai_tutor_docs",
-    connection=DATABASE_URL,
-    embeddings=embeddings,
-)
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 100
+PAGES_PER_TASK = 16
+DEFAULT_MANIFEST = ".cache/ingest_manifest.json"
 
-# Load original document
-loader = PyPDFLoader("data/my_notes.pdf")
-docs = loader.load()
 
-# Split document
-text_splitter = RecursiveCharacterTextSplitter(
-    chunk_size=500,
-    chunk_overlap=100,
-)
-split_docs = text_splitter.split_documents(docs)
+# ============================================================
+# PARSING — runs in worker processes
+# ============================================================
+def count_pages(path: str) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def parse_pages(path: str, start: int, end: int) -> list[Document]:
+    """Extract pages [start, end) of one PDF as Documents."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    total = len(reader.pages)
+    return [
+        Document(
+            page_content=reader.pages[i].extract_text() or "",
+            metadata={"source": path, "page": i, "total_pages": total},
+        )
+        for i in range(start, min(end, total))
+    ]
+
+
+def page_tasks(paths: list[str], pool: ProcessPoolExecutor) -> list[tuple[str, int, int]]:
+    """Split every PDF into page ranges so large files parse in parallel too."""
+    tasks = []
+    for path, total in zip(paths, pool.map(count_pages, paths)):
+        for start in range(0, total, PAGES_PER_TASK):
+            tasks.append((path, start, min(start + PAGES_PER_TASK, total)))
+    return tasks
+
+
+def iter_parsed(tasks, pool: ProcessPoolExecutor, prefetch: int):
+    """
+    Yield (task, pages) in task order, keeping at most `prefetch` ranges
+    in flight so parsed pages never pile up in memory.
+    """
+    pending = deque()
+    tasks = iter(tasks)
+
+    for task in tasks:
+        pending.append((task, pool.submit(parse_pages, *task)))
+        if len(pending) >= prefetch:
+            break
+
+    while pending:
+        task, future = pending.popleft()
+        next_task = next(tasks, None)
+        if next_task is not None:
+            pending.append((next_task, pool.submit(parse_pages, *next_task)))
+        yield task, future.result()
+
+
+# ============================================================
+# MANIFEST — what is already in the vector store
+# ============================================================
+# {
+#   "root":    absolute corpus directory,
+#   "files":   {source: {"sha256": file hash, "ids": [chunk ids]}},        committed
+#   "pending": {source: {"sha256": ..., "done": [ranges], "ids": [...]}}   in progress
+# }
+# where source is a PDF's path relative to the corpus directory.
+def corpus_files(directory: str) -> dict[str, str]:
+    """PDFs under `directory` as {source: absolute path}, sorted by source."""
+    root = os.path.abspath(directory)
+    paths = sorted(
+        os.path.join(dirpath, name)
+        for dirpath, _, names in os.walk(root)
+        for name in names
+        if name.lower().endswith(".pdf")
+    )
+    return {os.path.relpath(path, root): path for path in paths}
+
+
+def chunk_id(source: str, text: str) -> str:
+    """Stable content hash used as the vector store ID of a chunk."""
+    return hashlib.sha256(f"{source}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def task_key(task: tuple[str, int, int]) -> str:
+    _, start, end = task
+    return f"{start}-{end}"
+
+
+def load_manifest(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"files": {}, "pending": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def stored_ids(engine) -> list[str]:
+    """IDs of every row in the collection."""
+    with engine.connect() as conn:
+        return list(conn.execute(
+            text(
+                f"SELECT id FROM {EMBEDDING_TABLE} WHERE collection_id = "
+                "(SELECT uuid FROM langchain_pg_collection WHERE name = :collection)"
+            ),
+            {"collection": COLLECTION_NAME},
+        ).scalars())
+
+
+def up_to_date(entry: dict | None, digest: str, in_store: set[str]) -> bool:
+    """
+    Whether a manifest entry still describes the stored file: same content,
+    and every chunk it lists still in the collection (a reset or restored
+    database keeps the manifest but not the rows).
+    """
+    return bool(entry) and entry.get("sha256") == digest and set(entry["ids"]) <= in_store
+
+
+def save_manifest(path: str, manifest: dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)  # atomic — a crash never leaves a half-written file
+
+
+# ============================================================
+# PIPELINE
+# ============================================================
+def ingest(
+    directory: str,
+    workers: int,
+    batch_size: int,
+    manifest_path: str,
+    force: bool = False,
+    maintain_index: bool = True,
+) -> None:
+    corpus_root = os.path.abspath(directory)
+    sources = corpus_files(corpus_root)
+    keys = {path: source for source, path in sources.items()}
+
+    manifest = load_manifest(manifest_path)
+    if manifest.setdefault("root", corpus_root) != corpus_root:
+        raise SystemExit(
+            f"❌ {manifest_path} tracks {manifest['root']}, not {corpus_root}. "
+            "Use the same directory, or a separate --manifest and collection."
+        )
+    files, pending = manifest["files"], manifest["pending"]
+
+    # ✅ NOTE: Same model and local cache as rag.py (see src/models.py)
+    embeddings = load_embeddings(encode_kwargs={"batch_size": batch_size})
+    vectorstore = PGVector(
+        collection_name=COLLECTION_NAME,
+        connection=DATABASE_URL,
+        embeddings=embeddings,
+        embedding_length=EMBEDDING_DIM,
+    )
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+    )
+    engine = create_engine(DATABASE_URL)
+
+    # ----- Removed files: drop all of their chunks -----
+    for source in sorted((set(files) | set(pending)) - set(sources)):
+        ids = files.pop(source, {}).get("ids", []) + pending.pop(source, {}).get("ids", [])
+        if ids:
+            vectorstore.delete(ids=ids)
+        print(f"🗑  Removed {source}")
+    save_manifest(manifest_path, manifest)
+
+    # ----- Unchanged files whose chunks are all stored are skipped without parsing -----
+    in_store = set(stored_ids(engine))
+    changed = []
+    missing = 0
+    for source, path in sources.items():
+        digest = file_hash(path)
+        if not force and up_to_date(files.get(source), digest, in_store):
+            continue
+        if files.get(source, {}).get("sha256") == digest and not force:
+            missing += 1
+        if not up_to_date(pending.get(source), digest, in_store):
+            pending[source] = {"sha256": digest, "done": [], "ids": []}
+        changed.append(path)
+
+    print(
+        f"📄 {len(sources)} PDFs, {len(changed) - missing} new or changed"
+        + (f", {missing} unchanged with chunks missing from the database" if missing else "")
+    )
+
+    def finalize(source: str) -> None:
+        """Delete chunks that no longer exist and commit the file."""
+        state = pending.pop(source)
+        stale = set(files.get(source, {}).get("ids", [])) - set(state["ids"])
+        if stale:
+            vectorstore.delete(ids=list(stale))
+        files[source] = {"sha256": state["sha256"], "ids": state["ids"]}
+        save_manifest(manifest_path, manifest)
+        print(f"  ✔ {source}: {len(state['ids'])} chunks, {len(stale)} removed")
+
+    pages_done = 0
+    chunks_embedded = 0
+    chunks_skipped = 0
+    start_time = time.perf_counter()
+
+    # Spawned, not forked: the embedding model has already started torch's
+    # thread pools, and forking them can deadlock (and copies the model)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        tasks = [
+            t for t in page_tasks(changed, pool)
+            if task_key(t) not in pending[keys[t[0]]]["done"]
+        ]
+        remaining = {keys[path]: 0 for path in changed}
+        for path, _, _ in tasks:
+            remaining[keys[path]] += 1
+
+        # Files whose ranges all finished before a crash only need committing
+        for source in [s for s, n in remaining.items() if n == 0]:
+            finalize(source)
+
+        for task, pages in iter_parsed(tasks, pool, prefetch=workers * 2):
+            source = keys[task[0]]
+            state = pending[source]
+            seen = set(state["ids"])
+            known = set(seen)
+            if not force:
+                known |= set(files.get(source, {}).get("ids", [])) & in_store
+
+            for page in pages:
+                page.metadata["source"] = source
+
+            # Only chunks whose content hash isn't stored yet get embedded
+            new_chunks = {}
+            for chunk in splitter.split_documents(pages):
+                if not chunk.page_content.strip():
+                    continue
+                cid = chunk_id(source, chunk.page_content)
+                if cid not in seen:
+                    seen.add(cid)
+                    state["ids"].append(cid)
+                if cid in known or cid in new_chunks:
+                    chunks_skipped += 1
+                    continue
+                new_chunks[cid] = chunk
+
+            for batch in batched(new_chunks.items(), batch_size):
+                texts = [chunk.page_content for _, chunk in batch]
+                vectors = embeddings.embed_documents(texts)
+                # One multi-row upsert per batch, keyed by content hash
+                vectorstore.add_embeddings(
+                    texts=texts,
+                    embeddings=vectors,
+                    metadatas=[chunk.metadata for _, chunk in batch],
+                    ids=[cid for cid, _ in batch],
+                )
+                chunks_embedded += len(batch)
+
+            pages_done += len(pages)
+            state["done"].append(task_key(task))
+            save_manifest(manifest_path, manifest)
+
+            elapsed = time.perf_counter() - start_time
+            print(
+                f"  {source}:{task_key(task)}  "
+                f"{pages_done / elapsed:.1f} pages/s  {chunks_embedded / elapsed:.1f} chunks/s"
+            )
+
+            remaining[source] -= 1
+            if remaining[source] == 0:
+                finalize(source)
+
+    # ----- Rows the manifest doesn't track: pre-manifest random IDs, other spellings -----
+    if not pending:
+        tracked = {cid for state in files.values() for cid in state["ids"]}
+        untracked = [cid for cid in stored_ids(engine) if cid not in tracked]
+        if untracked:
+            vectorstore.delete(ids=untracked)
+            print(f"🗑  Removed {len(untracked)} chunks not in the manifest")
+
+    elapsed = time.perf_counter() - start_time
+    print(
+        f"✅ Embedded {chunks_embedded} chunks ({chunks_skipped} unchanged) "
+        f"from {pages_done} pages in {elapsed:.1f}s "
+        f"({pages_done / max(elapsed, 1e-9):.1f} pages/s, "
+        f"{chunks_embedded / max(elapsed, 1e-9):.1f} chunks/s)"
+    )
+
+    # HNSW absorbs inserts as they happen; IVFFlat lists go stale after bulk loads
+    if maintain_index and chunks_embedded:
+        if VECTOR_INDEX_TYPE == "ivfflat":
+            rebuild_index(engine, VECTOR_INDEX_TYPE)
+        else:
+            create_index(engine, VECTOR_INDEX_TYPE)
+        create_text_index(engine)
+        print(f"📇 {VECTOR_INDEX_TYPE} and full-text indexes are up to date")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest a directory of PDFs into PGVector.")
+    parser.add_argument("directory", nargs="?", default="data")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="PDF parsing processes")
+    parser.add_argument("--batch-size", type=int, default=64, help="Chunks per embedding/insert batch")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--force", action="store_true", help="Re-embed every chunk, even unchanged ones")
+    parser.add_argument("--no-index", action="store_true", help="Skip ANN index maintenance afterwards")
+    args = parser.parse_args()
+
+    ingest(
+        args.directory,
+        args.workers,
+        args.batch_size,
+        args.manifest,
+        force=args.force,
+        maintain_index=not args.no_index,
+    )
 
-# Store in PGVector
-vectorstore.add_documents(split_docs)
 
-print(f"✅ Ingested {len(split_docs)} chunks into PGVector successfully!")
+if __name__ == "__main__":
+    main()
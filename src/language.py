@@ -1,9 +1,12 @@
 # src/language.py
 
-from langdetect import detect, DetectorFactory
-from .llm import llm
+import os
+import re
+import hashlib
+import threading
 
-DetectorFactory.seed = 0  # Consistent detection
+from .llm import llm, estimate_tokens
+from .cache import LRUCache, SqliteStore, TieredCache, normalize_text
 
 # Allowed languages in your tutor system
 SUPPORTED_LANGS = {"en", "ta", "hi"}
@@ -15,54 +18,146 @@ LANG_NAMES = {
 }
 
 
+# Sentence ends: Latin punctuation, the Devanagari danda, or a line break
+# (answers are formatted as bullet lines, which rarely end in a full stop).
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?।])\s+|\n+")
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences, dropping empty fragments."""
+    return [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s.strip()]
+
+
 def get_language_name(lang_code: str) -> str:
     """Convert a BCP-47 code to a full language name."""
     return LANG_NAMES.get(lang_code, lang_code)
 
 
+# ----- Detection tables, built once at import -----
+# One regex pass finds the first Indic script character and tells us which.
+_SCRIPT = re.compile(r"([\u0B80-\u0BFF])|([\u0900-\u097F])")
+_TAMIL_SCRIPT = re.compile(r"[\u0B80-\u0BFF]")
+_DEVANAGARI_SCRIPT = re.compile(r"[\u0900-\u097F]")
+_LATIN_WORD = re.compile(r"[a-z]+")
+
+# Romanized keywords, matched as whole words ("tum" must not hit "stumble")
+TAMIL_KEYWORDS = frozenset({
+    "enna", "yenna", "epdi", "eppadi", "epadi", "solunga", "sollunga", "sollu",
+    "ungal", "unga", "enaku", "enakku", "podu", "naanga", "irukku", "venum",
+    "theriyum", "theriyala", "puriyala", "pannunga", "pannanum", "kathukanum",
+})
+HINDI_KEYWORDS = frozenset({
+    "kya", "kaise", "kyun", "kyon", "mujhe", "hain", "nahi", "nahin",
+    "kartaa", "karta", "karte", "karna", "samjhao", "batao", "kaun",
+})
+# Also English words or names ("naan" bread, "hai" for hi, MATLAB): these
+# only count towards a language alongside a second marker
+TAMIL_WEAK_KEYWORDS = frozenset({"naan", "illa"})
+HINDI_WEAK_KEYWORDS = frozenset({"hai", "tum", "aap", "mera", "meri", "matlab", "kahan"})
+
+
 def is_tamil(text: str) -> bool:
     """Check if Tamil characters are present."""
-    return any("\u0B80" <= ch <= "\u0BFF" for ch in text)
+    return _TAMIL_SCRIPT.search(text) is not None
+
+
+def matches_language(text: str, lang_code: str) -> bool:
+    """
+    Cheap check that an answer is written in the expected language.
+    Tamil/Hindi answers must contain their script (they still quote English
+    examples); English answers must contain neither.
+    """
+    has_tamil = _TAMIL_SCRIPT.search(text) is not None
+    has_hindi = _DEVANAGARI_SCRIPT.search(text) is not None
+
+    if lang_code == "ta":
+        return has_tamil
+    if lang_code == "hi":
+        return has_hindi
+    return not has_tamil and not has_hindi
 
 
 def detect_language(text: str) -> str:
     """
     Only detect English / Tamil / Hindi.
-    Block Spanish, French, German, etc.
+    Anything else (Spanish, French, German, ...) is treated as English.
+
+    Native script decides first; otherwise romanized Tamil/Hindi keywords
+    are matched as whole words. One keyword is enough, but words that are
+    also English need a second marker. There is no statistical fallback: once
+    both scripts are ruled out, a generic detector could only tell English
+    from other Latin-script languages, which all map to "en" anyway.
     """
+    # ----- Tamil / Devanagari script, single pass -----
+    match = _SCRIPT.search(text)
+    if match:
+        return "ta" if match.group(1) else "hi"
+
+    # ----- Romanized keywords, whole words only -----
+    words = set(_LATIN_WORD.findall(text.lower()))
+    if words & TAMIL_KEYWORDS or len(words & TAMIL_WEAK_KEYWORDS) >= 2:
+        return "ta"
+    if words & HINDI_KEYWORDS or len(words & HINDI_WEAK_KEYWORDS) >= 2:
+        return "hi"
+    return "en"
 
-    text_l = text.lower().strip()
 
-    # ----- Tamil Unicode detection -----
-    if any("\u0B80" <= ch <= "\u0BFF" for ch in text):
-        return "ta"
+# ============================================================
+# TRANSLATION MEMORY
+# ============================================================
+# Per-sentence (normalized source, target language) → translation.
+# Example sentences and boilerplate recur across answers, so each one is
+# translated once; only sentences not seen before go to the LLM.
+TRANSLATION_CACHE_MAX_BYTES = int(os.getenv("TRANSLATION_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH", ".cache/translations.sqlite")
+TRANSLATION_DISK_CACHE_MAX_BYTES = int(os.getenv("TRANSLATION_DISK_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
 
-    # ----- Tamil keyword detection -----
-    tamil_words = ["enna", "epdi", "solunga", "ungal", "enaku", "podu"]
-    if any(w in text_l for w in tamil_words):
-        return "ta"
+translation_memory = TieredCache(
+    LRUCache(max_bytes=TRANSLATION_CACHE_MAX_BYTES),
+    SqliteStore(TRANSLATION_CACHE_PATH, table="translations", max_bytes=TRANSLATION_DISK_CACHE_MAX_BYTES)
+    if TRANSLATION_CACHE_PATH else None,
+)
 
-    # ----- Hindi keyword detection -----
-    hindi_words = ["kya", "kaise", "mera", "tum", "hain", "kartaa"]
-    if any(w in text_l for w in hindi_words):
-        return "hi"
+_SEGMENTS = re.compile(f"({SENTENCE_BOUNDARY.pattern})")
+_NUMBERED_LINE = re.compile(r"^\[(\d+)\]\s?(.*)$")
+
+
+class TranslationStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sentences = 0
+        self.cached = 0
+        self.llm_calls = 0
+        self.saved_tokens = 0
+
+    def record(self, sentences: int, cached: int, saved_tokens: int, llm_calls: int) -> None:
+        with self._lock:
+            self.sentences += sentences
+            self.cached += cached
+            self.saved_tokens += saved_tokens
+            self.llm_calls += llm_calls
+
+    def as_dict(self) -> dict:
+        return {
+            "sentences": self.sentences,
+            "cached_sentences": self.cached,
+            "hit_rate": round(self.cached / self.sentences, 4) if self.sentences else 0.0,
+            "saved_tokens": self.saved_tokens,
+            "llm_calls": self.llm_calls,
+            "memory": translation_memory.stats(),
+        }
 
-    # ----- Block langdetect for short English text -----
-    if len(text_l.split()) < 5:
-        return "en"  # prevents Spanish detection
 
-    # ----- Safe langdetect for longer sentences -----
-    try:
-        lang = detect(text_l)
-        if lang in ["en", "ta", "hi"]:
-            return lang
-        return "en"   # BLOCK es, fr, de
-    except:
-        return "en"
+translation_stats = TranslationStats()
 
 
-def translate_text(text: str, target_lang: str) -> str:
-    """Translate text to target language using the LLM."""
+def translation_key(sentence: str, target_lang: str) -> str:
+    raw = f"{target_lang}\x00{normalize_text(sentence)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def translate_whole(text: str, target_lang: str) -> str:
+    """Single-shot translation of a whole text (no sentence alignment)."""
     lang_name = get_language_name(target_lang)
 
     prompt = f"""
@@ -76,4 +171,80 @@ Text:
 """
 
     response = llm.invoke(prompt)
-    return response.content.strip()
\ No newline at end of file
+    return response.content.strip()
+
+
+def translate_batch(sentences: list[str], target_lang: str) -> list[str] | None:
+    """
+    Translate several sentences in one LLM call using numbered lines.
+    Returns None if the reply can't be aligned back to the input.
+    """
+    lang_name = get_language_name(target_lang)
+    numbered = "\n".join(f"[{i}] {sentence}" for i, sentence in enumerate(sentences, 1))
+
+    prompt = f"""
+You are a professional translator.
+
+Translate each numbered line below into {lang_name}.
+Return exactly {len(sentences)} lines in the same "[n] translation" format,
+one per input line, in the same order — no notes, no explanations.
+
+{numbered}
+"""
+
+    reply = llm.invoke(prompt).content
+    translated = {}
+    for line in reply.splitlines():
+        match = _NUMBERED_LINE.match(line.strip())
+        if match:
+            translated[int(match.group(1))] = match.group(2).strip()
+
+    if sorted(translated) != list(range(1, len(sentences) + 1)):
+        return None
+    return [translated[i] for i in range(1, len(sentences) + 1)]
+
+
+def translate_text(text: str, target_lang: str) -> tuple[str, int]:
+    """
+    Translate text to the target language using the LLM, one sentence
+    at a time through the translation memory. Sentence separators
+    (line breaks, spacing) are kept as they were.
+
+    Returns the translation and the number of LLM calls it took (0 when
+    every sentence came from the memory).
+    """
+    # Odd positions are the separators captured by _SEGMENTS
+    segments = _SEGMENTS.split(text)
+    positions = [i for i in range(0, len(segments), 2) if segments[i].strip()]
+    if not positions:
+        return text.strip(), 0
+
+    keys = {i: translation_key(segments[i], target_lang) for i in positions}
+    translations = {i: translation_memory.get(keys[i]) for i in positions}
+    missing = [i for i in positions if translations[i] is None]
+
+    saved_tokens = sum(
+        estimate_tokens(segments[i]) + estimate_tokens(translations[i])
+        for i in positions
+        if translations[i] is not None
+    )
+    llm_calls = 0
+
+    if missing:
+        llm_calls = 1
+        results = translate_batch([segments[i].strip() for i in missing], target_lang)
+
+        if results is None:
+            # Couldn't align the batch — fall back to translating the whole text
+            translation_stats.record(len(positions), len(positions) - len(missing), saved_tokens, 2)
+            return translate_whole(text, target_lang), 2
+
+        for i, translated in zip(missing, results):
+            translations[i] = translated
+            translation_memory.set(keys[i], translated)
+
+    translation_stats.record(len(positions), len(positions) - len(missing), saved_tokens, llm_calls)
+
+    for i in positions:
+        segments[i] = translations[i]
+    return "".join(segments).strip(), llm_calls
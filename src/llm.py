@@ -15,3 +15,12 @@ llm = ChatGroq(
     max_tokens=1024,
     groq_api_key=os.getenv("GROQ_API_KEY")
 )
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate for prompt budgeting — no tokenizer load.
+    English runs ~4 characters per token; Tamil/Hindi script is far denser.
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return int(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5) + 1
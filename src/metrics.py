@@ -0,0 +1,101 @@
+# src/metrics.py
+
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# Seconds, from sub-millisecond cache lookups up to slow Groq/ElevenLabs calls
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+STAGE_SECONDS = Histogram(
+    "tutor_stage_seconds",
+    "Time spent in each pipeline stage. 'llm' is the model call alone; "
+    "'context' (retrieval and packing, broken down into 'embedding', "
+    "'retrieval', 'lexical' and 'rerank'), 'history' and 'answer_cache' "
+    "are timed separately.",
+    ["stage"],
+    buckets=BUCKETS,
+)
+STAGE_WAIT_SECONDS = Histogram(
+    "tutor_stage_wait_seconds",
+    "Time spent waiting for a stage's concurrency slot.",
+    ["stage"],
+    buckets=BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "tutor_request_seconds",
+    "End-to-end request latency.",
+    ["path", "status"],
+    buckets=BUCKETS,
+)
+PROMPT_TOKENS = Histogram(
+    "tutor_prompt_tokens",
+    "Estimated input tokens of the RAG prompt, by part.",
+    ["part"],
+    buckets=(50, 100, 200, 400, 800, 1200, 1600, 2400, 3200, 4800),
+)
+RERANK_SKIPPED = Counter(
+    "tutor_rerank_skipped_total",
+    "Retrievals that fell back to fused order because reranking missed its budget.",
+)
+
+# Per-request state, propagated into worker threads by asyncio.to_thread
+trace_id_var: ContextVar[str | None] = ContextVar("trace_id", default=None)
+_timings: ContextVar[list | None] = ContextVar("stage_timings", default=None)
+_usage: ContextVar[dict | None] = ContextVar("token_usage", default=None)
+
+
+def start_request(trace_id: str | None = None) -> str:
+    """Begin collecting stage timings for the current request."""
+    trace_id = trace_id or uuid.uuid4().hex
+    trace_id_var.set(trace_id)
+    _timings.set([])
+    _usage.set({})
+    return trace_id
+
+
+def record(name: str, seconds: float, histogram: Histogram = STAGE_SECONDS) -> None:
+    histogram.labels(name).observe(seconds)
+    timings = _timings.get()
+    if timings is not None and histogram is STAGE_SECONDS:
+        timings.append((name, seconds))
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block as pipeline stage `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def record_prompt_tokens(parts: dict[str, int]) -> None:
+    """Record the token count of each part of one RAG prompt."""
+    for part, tokens in parts.items():
+        PROMPT_TOKENS.labels(part).observe(tokens)
+    PROMPT_TOKENS.labels("total").observe(sum(parts.values()))
+    usage = _usage.get()
+    if usage is not None:
+        usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + sum(parts.values())
+
+
+def prompt_tokens() -> int:
+    """RAG prompt tokens sent so far in the current request (0 on a cache hit)."""
+    return (_usage.get() or {}).get("prompt_tokens", 0)
+
+
+def server_timing() -> str:
+    """Server-Timing header value for the stages recorded so far."""
+    totals: dict[str, float] = {}
+    for name, seconds in _timings.get() or ():
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name};dur={1000 * seconds:.1f}" for name, seconds in totals.items())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
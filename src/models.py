@@ -0,0 +1,162 @@
+# src/models.py
+"""
+Shared model loader.
+
+    python -m src.models download   # pre-populate the local model cache
+    python -m src.models export     # build the int8 ONNX model ahead of time
+
+The embedding model is loaded at most once per process and always from
+MODEL_CACHE_DIR, so a warm container or pod never re-downloads it and
+skips the Hugging Face Hub round trip entirely.
+
+Embedding backends (EMBEDDING_BACKEND):
+    torch      PyTorch via sentence-transformers (default)
+    onnx       ONNX Runtime, fp32
+    onnx-int8  ONNX Runtime with dynamic int8 quantization — fastest on CPU
+    remote     the shared sidecar in src/embedding_server.py (multi-worker serving)
+The ONNX backends need the `onnx` extra (optimum[onnxruntime]).
+"""
+
+import os
+import time
+import argparse
+from functools import lru_cache
+
+from langchain_core.embeddings import Embeddings
+from langchain_huggingface import HuggingFaceEmbeddings
+
+# ✅ NOTE: Same model for ingestion and retrieval — must match or retrieval breaks
+EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", ".cache/models")
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+
+# Optional cross-encoder for reranking retrieved chunks; empty = disabled.
+# e.g. cross-encoder/mmarco-mMiniLMv2-L12-H384-v1 (multilingual, CPU-friendly)
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "")
+
+# Instruction set targeted by the int8 quantizer: avx2, avx512, avx512_vnni or arm64
+ONNX_QUANTIZATION = os.getenv("ONNX_QUANTIZATION", "avx2")
+
+
+def is_cached(model_name: str = EMBEDDING_MODEL) -> bool:
+    """True if the model files are already in MODEL_CACHE_DIR."""
+    from huggingface_hub import try_to_load_from_cache
+
+    path = try_to_load_from_cache(model_name, "config.json", cache_dir=MODEL_CACHE_DIR)
+    return isinstance(path, str)
+
+
+def quantized_model_dir() -> str:
+    return os.path.join(MODEL_CACHE_DIR, "onnx-int8", EMBEDDING_MODEL.replace("/", "__"))
+
+
+def quantized_file_name() -> str:
+    return f"onnx/model_qint8_{ONNX_QUANTIZATION}.onnx"
+
+
+def export_quantized_onnx() -> str:
+    """
+    Export the model to ONNX and apply dynamic int8 quantization.
+    The result is saved under MODEL_CACHE_DIR and reused on later starts.
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    target = quantized_model_dir()
+    if os.path.exists(os.path.join(target, quantized_file_name())):
+        return target
+
+    model = SentenceTransformer(EMBEDDING_MODEL, backend="onnx", cache_folder=MODEL_CACHE_DIR)
+    model.save(target)
+    export_dynamic_quantized_onnx_model(model, ONNX_QUANTIZATION, target)
+    return target
+
+
+def _torch_backend() -> tuple[str, dict]:
+    return EMBEDDING_MODEL, {}
+
+
+def _onnx_backend() -> tuple[str, dict]:
+    return EMBEDDING_MODEL, {"backend": "onnx"}
+
+
+def _onnx_int8_backend() -> tuple[str, dict]:
+    return export_quantized_onnx(), {
+        "backend": "onnx",
+        "model_kwargs": {"file_name": quantized_file_name()},
+    }
+
+
+# backend name → (model name or local path, SentenceTransformer kwargs)
+EMBEDDING_BACKENDS = {
+    "torch": _torch_backend,
+    "onnx": _onnx_backend,
+    "onnx-int8": _onnx_int8_backend,
+}
+
+
+def load_embeddings(
+    backend: str = EMBEDDING_BACKEND,
+    encode_kwargs: dict | None = None,
+) -> HuggingFaceEmbeddings:
+    """Load a fresh embeddings instance for `backend` from the local model cache."""
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    model_name, model_kwargs = EMBEDDING_BACKENDS[backend]()
+    if model_name == EMBEDDING_MODEL and is_cached():
+        # Don't ask the Hub for updates on every start
+        model_kwargs["local_files_only"] = True
+
+    return HuggingFaceEmbeddings(
+        model_name=model_name,
+        cache_folder=MODEL_CACHE_DIR,
+        model_kwargs=model_kwargs,
+        encode_kwargs=encode_kwargs or {},
+    )
+
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> Embeddings:
+    """Process-wide embedding model, loaded on first use."""
+    if EMBEDDING_BACKEND == "remote":
+        from .embedding_server import RemoteEmbeddings
+
+        return RemoteEmbeddings()
+    return load_embeddings()
+
+
+@lru_cache(maxsize=1)
+def get_reranker():
+    """Process-wide cross-encoder, or None when RERANKER_MODEL is unset."""
+    if not RERANKER_MODEL:
+        return None
+    from sentence_transformers import CrossEncoder
+
+    return CrossEncoder(
+        RERANKER_MODEL,
+        cache_folder=MODEL_CACHE_DIR,
+        local_files_only=is_cached(RERANKER_MODEL),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the local model cache.")
+    parser.add_argument("command", choices=["download", "export"])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "export":
+        path = export_quantized_onnx()
+        print(f"✅ int8 ONNX model ({ONNX_QUANTIZATION}) in {path} ({time.perf_counter() - start:.1f}s)")
+        return
+
+    embeddings = get_embeddings()
+    embeddings.embed_query("warm up")
+    if get_reranker() is not None:
+        print(f"✅ {RERANKER_MODEL} cached in {MODEL_CACHE_DIR}")
+    print(f"✅ {EMBEDDING_MODEL} cached in {MODEL_CACHE_DIR} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
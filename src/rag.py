@@ -1,16 +1,25 @@
 # src/rag.py
 
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
 from langchain_postgres import PGVector
-from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_core.messages import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableLambda
 from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_community.chat_message_histories import PostgresChatMessageHistory
 
-from .llm import llm  # ✅ FIXED: Import shared LLM — no duplicate, no model mismatch
+from .llm import llm, estimate_tokens  # ✅ FIXED: Import shared LLM — no duplicate, no model mismatch
+from .context import pack_context
+from .metrics import record_prompt_tokens
+from .embedding_service import QueryEmbedder
+from .embedding_server import RemoteEmbeddings
+from .models import get_embeddings, get_reranker
+from .retrieval import RETRIEVAL_MODE, HybridRetriever
+from .vector_index import EMBEDDING_DIM
+from .db import get_engine
+from .history import PooledChatMessageHistory
 
 load_dotenv()
 
@@ -20,78 +29,130 @@ assert DATABASE_URL, "DATABASE_URL is not set in .env"
 COLLECTION_NAME = "ai_tutor_docs"
 
 
+@lru_cache(maxsize=1)
+def get_query_embedder() -> QueryEmbedder | RemoteEmbeddings:
+    """Micro-batching, caching query embedder shared by retrieval and caches."""
+    embeddings = get_embeddings()
+    # The sidecar batches and caches queries across all workers; a local
+    # QueryEmbedder in front would send them on as plain document batches
+    if isinstance(embeddings, RemoteEmbeddings):
+        return embeddings
+    return QueryEmbedder(embeddings)
+
+
 def get_session_history(session_id: str):
-    """Return per-session PostgreSQL chat history store."""
-    return PostgresChatMessageHistory(
-        connection_string=DATABASE_URL,
-        session_id=session_id,
-        table_name="chat_history"
-    )
+    """Return per-session PostgreSQL chat history store (pooled connections)."""
+    return PooledChatMessageHistory(session_id)
+
+
+# Static tutor instructions. Rendered once per language pair and reused, so
+# every turn sends the identical, short system block.
+SYSTEM_PROMPT = (
+    "You are an English Learning Tutor. Students ask in Tamil, Hindi or English.\n"
+    "Teach ONLY English grammar, vocabulary, usage and examples — never Tamil grammar.\n\n"
+    "RULES:\n"
+    "1. The student wrote in {language}. Write the explanation directly in {output_language}; "
+    "never answer fully in English unless {output_language} is English.\n"
+    "2. Always give examples in English.\n"
+    "3. Keep it clear, short and structured — no long or repeated paragraphs.\n"
+    "4. Format every answer like this:\n"
+    "   - Explanation ({output_language})\n"
+    "   - English examples\n"
+)
+
+
+@lru_cache(maxsize=None)
+def system_prompt(language: str, output_language: str) -> SystemMessage:
+    return SystemMessage(content=SYSTEM_PROMPT.format(language=language, output_language=output_language))
 
 
 def format_docs(docs: list) -> str:
     """
-    ✅ FIXED: Stringify retrieved Document objects into plain text.
-    Without this, raw Document objects are passed to the prompt template
-    and rendered as Python repr strings, not their actual content.
+    Stringify retrieved Document objects into plain text for the prompt:
+    overlaps merged, repeats dropped, cut to the context token budget.
     """
     if not docs:
         return ""
-    return "\n\n".join(doc.page_content for doc in docs)
+    return pack_context(docs)
 
 
-def get_qa_chain():
-    # ✅ FIXED: Same embedding model as ingest.py — must match or retrieval breaks
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-    )
+def count_prompt_tokens(prompt_value):
+    """Record the prompt's input tokens by part, then pass it on unchanged."""
+    system, context, *history, question = prompt_value.to_messages()
+    record_prompt_tokens({
+        "system": estimate_tokens(system.content),
+        "context": estimate_tokens(context.content),
+        "history": sum(estimate_tokens(m.content) for m in history),
+        "question": estimate_tokens(question.content),
+    })
+    return prompt_value
+
+
+def build_retriever(mode: str = RETRIEVAL_MODE, reranker=None) -> HybridRetriever:
+    """Retriever over the document collection (see src/retrieval.py)."""
+    embedder = get_query_embedder()
 
     vectorstore = PGVector(
         collection_name=COLLECTION_NAME,
-        connection=DATABASE_URL,
-        embeddings=embeddings,
+        connection=get_engine(),
+        embeddings=embedder,
+        embedding_length=EMBEDDING_DIM,
+    )
+    return HybridRetriever(
+        vectorstore, embedder, get_engine(), COLLECTION_NAME, mode=mode, reranker=reranker,
     )
 
-    retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
 
+@lru_cache(maxsize=1)
+def get_retriever() -> HybridRetriever:
+    # Loading the reranker here keeps it out of the first request's budget
+    return build_retriever(reranker=get_reranker())
+
+
+def answer_input(question: str, language: str, output_language: str, context: str, history=()) -> dict:
+    """Variables for the answer chain."""
+    return {
+        "system": [system_prompt(language, output_language)],
+        "context": context,
+        "history": list(history),
+        "question": question,
+    }
+
+
+@lru_cache(maxsize=1)
+def get_answer_chain():
+    """
+    Prompt → LLM, for callers that retrieve context themselves (batch
+    answering). The conversational chain below wraps the same steps.
+    """
     prompt = ChatPromptTemplate.from_messages([
-        (
-    "system",
-    "You are an English Learning Tutor.\n"
-    "The student may ask questions in Tamil or English.\n"
-    "Your job is ONLY to teach ENGLISH grammar, vocabulary, usage, and examples.\n\n"
-    "CRITICAL RULES:\n"
-    "1. Always explain the concept in the student's language ({language}) so they understand.\n"
-    "2. Always give examples in English.\n"
-    "3. Keep the explanation clear, short, and structured.\n"
-    "4. Do NOT write long repeated paragraphs.\n"
-    "5. Do NOT teach Tamil grammar. Only teach ENGLISH.\n"
-    "6. Never respond fully in English unless the student language is English.\n"
-    "7. Format every answer like this:\n"
-    "   - Explanation ({language})\n"
-    "   - English examples\n"
-),
+        ("placeholder", "{system}"),
         (
             "system",
             "Relevant study material (use if helpful, ignore if empty or irrelevant):\n"
             "{context}"
         ),
-        # ✅ FIXED: History is injected here by RunnableWithMessageHistory
-        # Do NOT also set it in the inner lambda — that prevents injection from working
         ("placeholder", "{history}"),
         ("human", "{question}"),
     ])
+    return prompt | RunnableLambda(count_prompt_tokens) | llm
+
+
+def get_qa_chain():
+    retrieve = get_retriever().retrieve
 
     # ✅ FIXED: Context is properly formatted from Document objects to plain text
-    # ✅ FIXED: History key is NOT set in the inner dict — let RunnableWithMessageHistory handle it
+    # The history RunnableWithMessageHistory adds to the input must be passed
+    # on explicitly — answer_input() only returns the keys it builds
     rag_chain = (
-        {
-            "context": RunnableLambda(lambda x: x["question"]) | retriever | RunnableLambda(format_docs),
-            "question": RunnableLambda(lambda x: x["question"]),
-            "language": RunnableLambda(lambda x: x.get("language", "English")),
-        }
-        | prompt
-        | llm
+        RunnableLambda(lambda x: answer_input(
+            x["question"],
+            x.get("language", "English"),
+            x.get("output_language") or x.get("language", "English"),
+            format_docs(retrieve(x["question"])),
+            x.get("history", []),
+        ))
+        | get_answer_chain()
     )
 
     # ✅ Wrap with conversation history — history_messages_key must match placeholder in prompt
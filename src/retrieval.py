@@ -0,0 +1,252 @@
+# src/retrieval.py
+"""
+Hybrid retrieval for the RAG chain.
+
+Dense search (pgvector) finds paraphrases; Postgres full-text search finds
+exact grammar terms ("gerund", "past participle") that embeddings blur.
+Both rankings are merged with reciprocal rank fusion, and an optional
+cross-encoder reorders the fused candidates if it can do so within
+RERANK_BUDGET_MS — otherwise the fused order is used as is.
+"""
+
+import os
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from langchain_core.documents import Document
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+from .metrics import RERANK_SKIPPED, stage
+from .vector_index import EMBEDDING_TABLE, TEXT_COLUMN, TEXT_SEARCH_CONFIG, text_search_status
+
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")  # hybrid | dense | lexical
+RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", "3"))
+# Candidates taken from each ranking before fusion / reranking
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", "20"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "150"))
+
+# Full-text search runs alongside embedding + vector search
+_lexical_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lexical")
+# One reranker call at a time; requests that can't get it in budget skip it
+_rerank_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+
+
+def _submit(pool: ThreadPoolExecutor, func, *args):
+    """Submit with the caller's context, so stage timings reach its request."""
+    return pool.submit(contextvars.copy_context().run, func, *args)
+
+
+def doc_key(doc: Document) -> str:
+    return doc.id or doc.page_content
+
+
+def reciprocal_rank_fusion(rankings: list[list[Document]], k: int = RRF_K) -> list[Document]:
+    """Merge rankings by summing 1 / (k + rank) per document."""
+    scores: dict[str, float] = {}
+    docs: dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, 1):
+            key = doc_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1 / (k + rank)
+            docs.setdefault(key, doc)
+    return [docs[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+def reorder(docs: list[Document], scores) -> list[Document]:
+    order = sorted(range(len(docs)), key=lambda i: scores[i], reverse=True)
+    return [docs[i] for i in order]
+
+
+class HybridRetriever:
+    """Dense + full-text retrieval over the PGVector collection."""
+
+    def __init__(
+        self,
+        vectorstore,
+        embedder,
+        engine,
+        collection_name: str,
+        k: int = RETRIEVAL_K,
+        candidates: int = RETRIEVAL_CANDIDATES,
+        mode: str = RETRIEVAL_MODE,
+        reranker=None,
+        rerank_budget_ms: float = RERANK_BUDGET_MS,
+    ):
+        if mode not in ("hybrid", "dense", "lexical"):
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+        self.vectorstore = vectorstore
+        self.embedder = embedder
+        self.engine = engine
+        self.collection_name = collection_name
+        self.k = k
+        self.candidates = candidates
+        self.mode = mode
+        self.reranker = reranker
+        self.rerank_budget = rerank_budget_ms / 1000
+        self._lexical_available = mode != "dense" and self._check_text_search()
+
+    def _check_text_search(self) -> bool:
+        """Full-text search needs the tsvector column (python -m src.vector_index create)."""
+        column, index = text_search_status(self.engine)
+        if not column:
+            logger.warning(
+                "full-text column %s.%s is missing, using dense search only",
+                EMBEDDING_TABLE, TEXT_COLUMN,
+            )
+        elif not index:
+            logger.warning(
+                "full-text index on %s.%s is missing, lexical search will scan",
+                EMBEDDING_TABLE, TEXT_COLUMN,
+            )
+        return column
+
+    # ----- Rankings -----
+    def dense_search(self, question: str, limit: int) -> list[Document]:
+        """Embed once (batched + cached) and search by vector directly."""
+        with stage("embedding"):
+            vector = self.embedder.embed_query(question)
+        with stage("retrieval"):
+            return self.vectorstore.similarity_search_by_vector(vector, k=limit)
+
+    def dense_search_many(self, vectors: list[list[float]], limit: int) -> list[list[Document]]:
+        """Nearest chunks for many query vectors in one round trip (LATERAL join)."""
+        literals = ["[" + ",".join(str(float(x)) for x in vector) + "]" for vector in vectors]
+        with stage("retrieval"), self.engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT q.ord, d.id, d.document, d.cmetadata "
+                    "FROM unnest(CAST(:vectors AS text[])) WITH ORDINALITY AS q(vector, ord) "
+                    "CROSS JOIN LATERAL ("
+                    "  SELECT e.id, e.document, e.cmetadata "
+                    f"  FROM {EMBEDDING_TABLE} e "
+                    "  WHERE e.collection_id = "
+                    "    (SELECT uuid FROM langchain_pg_collection WHERE name = :collection) "
+                    "  ORDER BY e.embedding <=> CAST(q.vector AS vector) LIMIT :limit"
+                    ") d ORDER BY q.ord"
+                ),
+                {"vectors": literals, "collection": self.collection_name, "limit": limit},
+            ).all()
+        return self._group(rows, len(vectors))
+
+    def lexical_search(self, question: str, limit: int) -> list[Document]:
+        return self.lexical_search_many([question], limit)[0]
+
+    def lexical_search_many(self, questions: list[str], limit: int) -> list[list[Document]]:
+        """
+        Full-text search over chunk text, for one or many questions in one
+        query. Query terms are OR-ed so a single matching grammar term is
+        enough; ts_rank_cd orders the matches.
+        """
+        if not self._lexical_available:
+            return [[] for _ in questions]
+        try:
+            with stage("lexical"), self.engine.connect() as conn:
+                rows = conn.execute(
+                    text(
+                        "SELECT q.ord, d.id, d.document, d.cmetadata "
+                        "FROM unnest(CAST(:questions AS text[])) WITH ORDINALITY AS q(question, ord) "
+                        "CROSS JOIN LATERAL ("
+                        f"  SELECT e.id, e.document, e.cmetadata, ts_rank_cd(e.{TEXT_COLUMN}, t.query) AS rank "
+                        "  FROM (SELECT replace(plainto_tsquery(CAST(:config AS regconfig), q.question)::text, "
+                        "        '&', '|')::tsquery AS query) t, "
+                        f"       {EMBEDDING_TABLE} e "
+                        "  WHERE e.collection_id = "
+                        "    (SELECT uuid FROM langchain_pg_collection WHERE name = :collection) "
+                        f"    AND e.{TEXT_COLUMN} @@ t.query "
+                        "  ORDER BY rank DESC LIMIT :limit"
+                        ") d ORDER BY q.ord, d.rank DESC"
+                    ),
+                    {
+                        "config": TEXT_SEARCH_CONFIG,
+                        "questions": questions,
+                        "collection": self.collection_name,
+                        "limit": limit,
+                    },
+                ).all()
+        except ProgrammingError as e:
+            # This request falls back to dense results; the next one tries again
+            logger.warning("full-text search failed, using dense results: %s", e.orig)
+            return [[] for _ in questions]
+
+        return self._group(rows, len(questions))
+
+    @staticmethod
+    def _group(rows, count: int) -> list[list[Document]]:
+        """(ord, id, document, cmetadata) rows → one ranked list per query."""
+        results: list[list[Document]] = [[] for _ in range(count)]
+        for ord_, doc_id, document, metadata in rows:
+            results[ord_ - 1].append(
+                Document(id=str(doc_id), page_content=document, metadata=metadata or {})
+            )
+        return results
+
+    # ----- Reranking -----
+    def _scores(self, question: str, docs: list[Document]) -> list[float]:
+        with stage("rerank"):
+            return self.reranker.predict([(question, doc.page_content) for doc in docs])
+
+    def rerank(self, question: str, docs: list[Document]) -> list[Document]:
+        """Cross-encoder order if it arrives within budget, else the order given."""
+        future = _submit(_rerank_pool, self._scores, question, docs)
+        try:
+            scores = future.result(timeout=self.rerank_budget)
+        except FutureTimeout:
+            future.cancel()
+            RERANK_SKIPPED.inc()
+            return docs
+        return reorder(docs, scores)
+
+    # ----- Entry point -----
+    def retrieve(self, question: str) -> list[Document]:
+        fused = self.mode == "hybrid" or self.reranker is not None
+        limit = self.candidates if fused else self.k
+
+        lexical = None
+        if self.mode in ("hybrid", "lexical"):
+            lexical = _submit(_lexical_pool, self.lexical_search, question, limit)
+
+        rankings = []
+        if self.mode in ("hybrid", "dense"):
+            rankings.append(self.dense_search(question, limit))
+        if lexical is not None:
+            rankings.append(lexical.result())
+
+        docs = reciprocal_rank_fusion([r for r in rankings if r])
+        if self.reranker is not None and len(docs) > self.k:
+            docs = self.rerank(question, docs[: self.candidates])
+        return docs[: self.k]
+
+    def retrieve_many(self, questions: list[str]) -> list[list[Document]]:
+        """
+        Batch retrieval: all questions embedded in one forward pass and
+        searched in one query per ranking. Not latency-bound, so reranking
+        (if configured) always runs.
+        """
+        fused = self.mode == "hybrid" or self.reranker is not None
+        limit = self.candidates if fused else self.k
+
+        lexical = None
+        if self.mode in ("hybrid", "lexical"):
+            lexical = _submit(_lexical_pool, self.lexical_search_many, questions, limit)
+
+        rankings = []
+        if self.mode in ("hybrid", "dense"):
+            with stage("embedding"):
+                vectors = self.embedder.embed_queries(questions)
+            rankings.append(self.dense_search_many(vectors, limit))
+        if lexical is not None:
+            rankings.append(lexical.result())
+
+        results = []
+        for i, question in enumerate(questions):
+            docs = reciprocal_rank_fusion([ranking[i] for ranking in rankings if ranking[i]])
+            if self.reranker is not None and len(docs) > self.k:
+                docs = docs[: self.candidates]
+                docs = reorder(docs, self._scores(question, docs))
+            results.append(docs[: self.k])
+        return results
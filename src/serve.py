@@ -0,0 +1,87 @@
+# src/serve.py
+"""
+Production serving mode: N uvicorn workers sharing one embedding model and
+one set of caches.
+
+    python -m src.serve --workers 4
+
+With more than one worker:
+  - the embedding model is loaded once, in the sidecar from
+    src/embedding_server.py, and workers use EMBEDDING_BACKEND=remote;
+  - answers and served audio clips go to shared SQLite files next to the
+    TTS and translation caches, so any worker can answer a hit or serve
+    /audio/{id} for a clip another worker synthesized.
+Variables that are already set are left alone.
+"""
+
+import os
+import sys
+import time
+import secrets
+import argparse
+import subprocess
+from multiprocessing.connection import Client
+
+import uvicorn
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+
+def start_sidecar(backend: str, address: str, timeout: float = 300.0) -> subprocess.Popen:
+    """Launch the embedding sidecar and wait until it accepts connections."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.embedding_server", "--backend", backend, "--address", address],
+    )
+    authkey = os.environ["EMBEDDING_SERVICE_AUTHKEY"].encode()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("embedding sidecar exited during startup")
+        try:
+            Client(address, family="AF_UNIX", authkey=authkey).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise TimeoutError("embedding sidecar never came up")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API with several workers.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--app", default="src.app:app", help="ASGI app import string")
+    parser.add_argument("--factory", action="store_true", help="--app is an app factory")
+    args = parser.parse_args()
+
+    sidecar = None
+    if args.workers > 1:
+        os.environ.setdefault("ANSWER_CACHE_PATH", os.path.join(CACHE_DIR, "answers.sqlite"))
+        os.environ.setdefault("AUDIO_STORE_PATH", os.path.join(CACHE_DIR, "audio.sqlite"))
+
+        backend = os.getenv("EMBEDDING_BACKEND", "torch")
+        if backend != "remote":
+            address = os.environ.setdefault(
+                "EMBEDDING_SERVICE_ADDRESS", os.path.join(CACHE_DIR, "embeddings.sock"),
+            )
+            os.environ.setdefault("EMBEDDING_SERVICE_AUTHKEY", secrets.token_hex(16))
+            sidecar = start_sidecar(backend, address)
+            os.environ["EMBEDDING_BACKEND"] = "remote"
+
+    try:
+        uvicorn.run(
+            args.app,
+            factory=args.factory,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+        )
+    finally:
+        if sidecar is not None:
+            sidecar.terminate()
+            sidecar.wait()
+
+
+if __name__ == "__main__":
+    main()
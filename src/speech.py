@@ -1,10 +1,17 @@
 # src/speech.py
 
+import io
 import os
+import time
 import base64
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from elevenlabs.client import ElevenLabs
 from dotenv import load_dotenv
 
+from .cache import LRUCache, SqliteStore, TieredCache, normalize_text
+from .language import SENTENCE_BOUNDARY
+
 load_dotenv()
 
 assert os.getenv("ELEVENLABS_API_KEY"), "ELEVENLABS_API_KEY is not set in .env"
@@ -22,16 +29,39 @@ VOICE_MAP = {
 }
 DEFAULT_VOICE = "JBFqnCBsd6RMkjVDRZzb"
 
-# Languages where splitting by space is used to avoid TTS timeout on long text
-CHUNK_LANGUAGES = {"ta", "hi"}
+# Every answer is synthesized sentence by sentence (long sentences split on
+# word boundaries), so a sentence seen in any earlier answer is a cache hit
+# and long Tamil/Hindi text doesn't time out.
 MAX_CHUNK_LEN = 180
 
+TTS_MODEL_ID = "eleven_multilingual_v2"
+
+# Chunks are synthesized concurrently on a shared pool, so the total number
+# of in-flight ElevenLabs calls stays bounded across all requests.
+TTS_MAX_WORKERS = int(os.getenv("TTS_MAX_WORKERS", "4"))
+TTS_RETRIES = int(os.getenv("TTS_RETRIES", "2"))
+TTS_RETRY_BACKOFF = 0.5  # seconds, doubled after every failed attempt
+
+_tts_executor = ThreadPoolExecutor(max_workers=TTS_MAX_WORKERS, thread_name_prefix="tts")
+
+# Content-addressed audio cache, per chunk: tutoring answers repeat the same
+# explanations and example sentences, so most chunks have been paid for before.
+# Set TTS_CACHE_PATH to an empty string to keep the cache in memory only.
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+TTS_CACHE_PATH = os.getenv("TTS_CACHE_PATH", ".cache/tts.sqlite")
+TTS_DISK_CACHE_MAX_BYTES = int(os.getenv("TTS_DISK_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+tts_cache = TieredCache(
+    LRUCache(max_bytes=TTS_CACHE_MAX_BYTES),
+    SqliteStore(TTS_CACHE_PATH, table="tts_audio", max_bytes=TTS_DISK_CACHE_MAX_BYTES)
+    if TTS_CACHE_PATH else None,
+)
+
 
 def split_text_safe(text: str, max_len: int = MAX_CHUNK_LEN) -> list[str]:
     """
     Split long text into chunks of at most max_len characters.
     Splits on word boundaries to avoid cutting mid-word.
-    Used for Tamil and Hindi where ElevenLabs may time out on long inputs.
     """
     parts = []
     current = ""
@@ -50,12 +80,22 @@ def split_text_safe(text: str, max_len: int = MAX_CHUNK_LEN) -> list[str]:
     return parts if parts else [text]
 
 
+def split_for_tts(text: str) -> list[str]:
+    """TTS chunks: one per sentence, long sentences split by split_text_safe."""
+    return [
+        chunk
+        for sentence in SENTENCE_BOUNDARY.split(text)
+        if sentence.strip()
+        for chunk in split_text_safe(sentence.strip())
+    ]
+
+
 # ============================================================
 # SPEECH TO TEXT — ElevenLabs STT (Scribe)
 # ============================================================
-def speech_to_text(audio_path: str) -> str | None:
+def speech_to_text(audio: bytes) -> str | None:
     """
-    Transcribe an audio file to text using ElevenLabs Scribe STT.
+    Transcribe in-memory audio to text using ElevenLabs Scribe STT.
     Returns None if no valid speech is detected.
     """
     # Noise-only or invalid STT outputs to ignore
@@ -68,12 +108,11 @@ def speech_to_text(audio_path: str) -> str | None:
     }
 
     try:
-        with open(audio_path, "rb") as audio:
-            transcript = client.speech_to_text.convert(
-                file=audio,
-                model_id="scribe_v1",
-                diarize=False,
-            )
+        transcript = client.speech_to_text.convert(
+            file=io.BytesIO(audio),
+            model_id="scribe_v1",
+            diarize=False,
+        )
 
         if not transcript or not transcript.text:
             return None
@@ -97,41 +136,102 @@ def speech_to_text(audio_path: str) -> str | None:
 # ============================================================
 # TEXT TO SPEECH — ElevenLabs TTS
 # ============================================================
-def text_to_speech(text: str, language: str = "en") -> str | None:
+def synthesize_chunk(
+    chunk: str,
+    voice_id: str,
+    model_id: str = TTS_MODEL_ID,
+    retries: int = TTS_RETRIES,
+) -> bytes:
+    """Synthesize a single chunk, retrying transient failures with backoff."""
+    for attempt in range(retries + 1):
+        try:
+            stream = client.text_to_speech.convert(
+                text=chunk,
+                voice_id=voice_id,
+                model_id=model_id,
+            )
+            return b"".join(stream)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            print(f"[TTS RETRY] attempt {attempt + 1}/{retries}: {e}")
+            time.sleep(TTS_RETRY_BACKOFF * 2 ** attempt)
+
+
+def tts_cache_key(chunk: str, voice_id: str, model_id: str) -> str:
+    """Cache key for one chunk of audio: (normalized text, voice, model)."""
+    raw = f"{model_id}\x00{voice_id}\x00{normalize_text(chunk)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def synthesize_cached(chunk: str, voice_id: str, model_id: str = TTS_MODEL_ID) -> bytes:
+    """Synthesize a chunk and store the result in the TTS cache."""
+    audio = synthesize_chunk(chunk, voice_id, model_id)
+    if audio:
+        tts_cache.set(tts_cache_key(chunk, voice_id, model_id), audio)
+    return audio
+
+
+def synthesize_chunks(chunks: list[str], voice_id: str, model_id: str = TTS_MODEL_ID) -> bytes:
+    """
+    Synthesize chunks concurrently and return the audio in chunk order.
+    Cached chunks skip the API entirely; MP3 frames concatenate cleanly,
+    so the pieces are written straight into one buffer.
+    """
+    chunks = [chunk for chunk in chunks if chunk.strip()]
+    pieces: list = [tts_cache.get(tts_cache_key(c, voice_id, model_id)) for c in chunks]
+    misses = [i for i, piece in enumerate(pieces) if piece is None]
+
+    if len(misses) == 1:
+        i = misses[0]
+        pieces[i] = synthesize_cached(chunks[i], voice_id, model_id)
+
+    elif misses:
+        futures = {
+            i: _tts_executor.submit(synthesize_cached, chunks[i], voice_id, model_id)
+            for i in misses
+        }
+        try:
+            for i, future in futures.items():
+                pieces[i] = future.result()
+        finally:
+            # If one chunk failed for good, don't keep paying for the rest
+            for future in futures.values():
+                future.cancel()
+
+    audio = bytearray()
+    for piece in pieces:
+        audio += piece
+    return bytes(audio)
+
+
+def synthesize_speech(text: str, language: str = "en") -> bytes | None:
     """
     Convert text to speech using ElevenLabs.
-    Returns base64-encoded MP3 audio, or None on failure.
+    Returns raw MP3 bytes, or None on failure.
 
-    For Tamil and Hindi, splits text into smaller chunks first
-    to avoid ElevenLabs timeouts on long inputs.
+    Text is split into sentence chunks first (see split_for_tts), each
+    cached on its own.
     """
     if not text or not text.strip():
         return None
 
     voice_id = VOICE_MAP.get(language, DEFAULT_VOICE)
 
-    # Split only for languages that need it
-    chunks = split_text_safe(text) if language in CHUNK_LANGUAGES else [text]
+    chunks = split_for_tts(text)
 
     try:
-        final_audio = b""
-
-        for chunk in chunks:
-            if not chunk.strip():
-                continue
-
-            stream = client.text_to_speech.convert(
-                text=chunk,
-                voice_id=voice_id,
-                model_id="eleven_multilingual_v2",
-            )
-            final_audio += b"".join(stream)
-
-        if not final_audio:
-            return None
-
-        return base64.b64encode(final_audio).decode("utf-8")
+        final_audio = synthesize_chunks(chunks, voice_id)
+        return final_audio or None
 
     except Exception as e:
         print(f"[TTS ERROR] {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def text_to_speech(text: str, language: str = "en") -> str | None:
+    """Same as synthesize_speech, but returns base64-encoded MP3 for JSON responses."""
+    audio = synthesize_speech(text, language)
+    if audio is None:
+        return None
+    return base64.b64encode(audio).decode("utf-8")
@@ -0,0 +1,56 @@
+# src/streaming.py
+
+import json
+
+from .language import SENTENCE_BOUNDARY
+
+# Sentences shorter than this are held back and merged with the next one,
+# so headings like "- Explanation (Tamil)" don't become their own TTS call.
+MIN_SENTENCE_LEN = 40
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message."""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class SentenceBuffer:
+    """
+    Accumulates streamed LLM tokens and releases complete sentences
+    as soon as a sentence boundary arrives.
+    """
+
+    def __init__(self, min_len: int = MIN_SENTENCE_LEN):
+        self.min_len = min_len
+        self._pending = ""
+
+    def feed(self, token: str) -> list[str]:
+        """Add a token and return any sentences that are now complete."""
+        self._pending += token
+        sentences = []
+
+        while True:
+            match = SENTENCE_BOUNDARY.search(self._pending)
+            if not match:
+                break
+
+            # Keep short fragments buffered until the next boundary
+            if len(self._pending[:match.start()].strip()) < self.min_len:
+                next_match = SENTENCE_BOUNDARY.search(self._pending, match.end())
+                if not next_match:
+                    break
+                match = next_match
+
+            sentence = self._pending[:match.start()].strip()
+            self._pending = self._pending[match.end():]
+            if sentence:
+                sentences.append(sentence)
+
+        return sentences
+
+    def flush(self) -> str | None:
+        """Return whatever is left once the stream has ended."""
+        tail = self._pending.strip()
+        self._pending = ""
+        return tail or None
@@ -2,14 +2,78 @@
 
 import streamlit as st
 import requests
-import base64
+import json
+import time
 import uuid
+from collections import deque
 from streamlit_mic_recorder import mic_recorder
 
 API_BASE = "http://127.0.0.1:8000"
 
+# ElevenLabs' default output (mp3_44100_128) is constant bitrate, so a
+# clip's play time follows from its size
+MP3_BYTES_PER_SECOND = 128_000 / 8
+
 st.set_page_config(page_title="AI Tutor", page_icon="🎓", layout="centered")
 
+
+def fetch_audio(audio_url: str | None) -> bytes | None:
+    """Download a binary MP3 clip from the backend's /audio/{id} endpoint."""
+    if not audio_url:
+        return None
+    response = requests.get(f"{API_BASE}{audio_url}", timeout=30)
+    return response.content if response.status_code == 200 else None
+
+
+def iter_sse(response):
+    """Yield (event, data) pairs from a Server-Sent Events response."""
+    event, data = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+
+
+class AudioQueue:
+    """
+    Plays per-sentence clips in order as they arrive: each clip gets its
+    own autoplaying player once the one before it has finished.
+    """
+
+    def __init__(self, container):
+        self.container = container
+        self.pending: deque[bytes] = deque()
+        self.free_at = 0.0
+        self.audio = bytearray()
+
+    def add(self, segment: bytes) -> None:
+        self.pending.append(segment)
+        self.audio += segment
+        self.play_due()
+
+    def play_due(self) -> None:
+        if self.pending and time.monotonic() >= self.free_at:
+            segment = self.pending.popleft()
+            self.container.audio(segment, format="audio/mp3", autoplay=True)
+            self.free_at = time.monotonic() + len(segment) / MP3_BYTES_PER_SECOND
+
+    def clear(self) -> None:
+        """Drop clips not yet played (the answer was replaced)."""
+        self.pending.clear()
+        self.audio = bytearray()
+
+    def drain(self) -> None:
+        """Play what's left; returns once the last clip has finished."""
+        while self.pending or time.monotonic() < self.free_at:
+            time.sleep(max(self.free_at - time.monotonic(), 0))
+            self.play_due()
+
+
 # -------------------------------------------------------
 # Session Setup
 # -------------------------------------------------------
@@ -51,47 +115,77 @@ if prompt := st.chat_input("Ask your question..."):
     st.session_state.messages.append({"role": "user", "content": prompt})
 
     with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
-            try:
-                # ✅ FIXED: Do NOT include output_lang=None in params — omit it entirely
-                # Passing None sends the literal string "None" in query params
-                params = {
-                    "question": prompt,
-                    "session_id": st.session_state.session_id,
-                }
-
-                response = requests.post(
-                    f"{API_BASE}/ask-text",
-                    params=params,
-                    timeout=60,
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-
-                    if data.get("error"):
-                        st.warning(f"⚠️ {data['error']}")
-                    else:
-                        reply = data.get("response_text", "No response received.")
-
-                        audio_bytes = None
-                        if data.get("audio_base64"):
-                            audio_bytes = base64.b64decode(data["audio_base64"])
+        text_placeholder = st.empty()
+        audio_queue = AudioQueue(st.container())
+
+        try:
+            # ✅ FIXED: Do NOT include output_lang=None in params — omit it entirely
+            # Passing None sends the literal string "None" in query params
+            params = {
+                "question": prompt,
+                "session_id": st.session_state.session_id,
+                "audio_format": "url",
+            }
+
+            # Tokens and per-sentence audio arrive as SSE events, so the
+            # answer renders and its sentences play, one after another,
+            # while the rest is still being generated.
+            with requests.post(
+                f"{API_BASE}/ask-text-stream",
+                params=params,
+                stream=True,
+                timeout=60,
+            ) as response:
+
+                if response.status_code != 200:
+                    st.error(f"Backend error: {response.status_code}")
+                elif not response.headers.get("content-type", "").startswith("text/event-stream"):
+                    st.warning(f"⚠️ {response.json().get('error', 'No response received.')}")
+                else:
+                    reply = ""
+
+                    for event, data in iter_sse(response):
+                        audio_queue.play_due()
+
+                        if event == "token":
+                            reply += data["text"]
+                            text_placeholder.markdown(reply + "▌")
 
+                        elif event == "audio" and data.get("audio_url"):
+                            segment = fetch_audio(data["audio_url"])
+                            if segment:
+                                audio_queue.add(segment)
+
+                        elif event == "translation":
+                            # The model answered in the wrong language; the
+                            # translation and its audio replace the original
+                            reply = data["text"]
+                            text_placeholder.markdown(reply + "▌")
+                            audio_queue.clear()
+
+                        elif event == "done":
+                            reply = data.get("response_text") or reply
+
+                        elif event == "error":
+                            st.error(f"Backend error: {data.get('detail')}")
+
+                    text_placeholder.markdown(reply)
+                    # st.rerun() below redraws the page, which would cut playback short
+                    audio_queue.drain()
+
+                    if reply:
                         st.session_state.messages.append({
                             "role": "assistant",
                             "content": reply,
-                            "audio": audio_bytes,
+                            "audio": bytes(audio_queue.audio) or None,
                         })
-                else:
-                    st.error(f"Backend error: {response.status_code}")
 
-            except requests.exceptions.Timeout:
-                st.error("⏱ Request timed out. Please try again.")
-            except requests.exceptions.ConnectionError:
-                st.error("🔌 Cannot connect to the backend. Make sure the FastAPI server is running.")
-            except Exception as e:
-                st.error(f"Unexpected error: {e}")
+        except requests.exceptions.Timeout:
+            st.error("⏱ Request timed out. Please try again.")
+        except requests.exceptions.ConnectionError:
+            st.error("🔌 Cannot connect to the backend. Make sure the FastAPI server is running.")
+        except Exception as e:
+            st.error(f"Unexpected error: {e}")
 
     st.rerun()
 
@@ -106,6 +200,7 @@ if not st.session_state.is_processing_voice:
     audio = mic_recorder(
         start_prompt="🎤 Speak",
         stop_prompt="🛑 Stop",
+        format="wav",  # PCM WAV lets the backend reject silent clips locally
         key="voice_recorder",
     )
 
@@ -124,7 +219,10 @@ if st.session_state.is_processing_voice and st.session_state.recorded_audio:
         # Previously, if an exception was raised, is_processing_voice stayed True forever
         try:
             # ✅ FIXED: Do NOT pass output_lang=None — omit from params entirely
-            params = {"session_id": st.session_state.session_id}
+            params = {
+                "session_id": st.session_state.session_id,
+                "audio_format": "url",
+            }
 
             response = requests.post(
                 f"{API_BASE}/ask-voice",
@@ -148,9 +246,7 @@ if st.session_state.is_processing_voice and st.session_state.recorded_audio:
                             "content": user_text,
                         })
 
-                        audio_bytes = None
-                        if data.get("audio_base64"):
-                            audio_bytes = base64.b64decode(data["audio_base64"])
+                        audio_bytes = fetch_audio(data.get("audio_url"))
 
                         st.session_state.messages.append({
                             "role": "assistant",
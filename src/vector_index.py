@@ -0,0 +1,192 @@
+# src/vector_index.py
+"""
+Approximate nearest-neighbor index management for the PGVector collection.
+
+    python -m src.vector_index status
+    python -m src.vector_index create  [--type hnsw|ivfflat]
+    python -m src.vector_index rebuild [--type hnsw|ivfflat]
+    python -m src.vector_index reindex
+    python -m src.vector_index drop
+
+Without an index every similarity search is a sequential scan over all
+embeddings. HNSW keeps itself up to date as rows are inserted; IVFFlat
+computes its lists at build time and should be rebuilt after bulk ingestion.
+
+`create` also adds the full-text side used by hybrid retrieval: a stored
+tsvector column over the chunk text with a GIN index.
+"""
+
+import os
+import argparse
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+EMBEDDING_TABLE = "langchain_pg_embedding"
+EMBEDDING_DIM = 384  # paraphrase-multilingual-MiniLM-L12-v2
+
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "hnsw")
+
+# Build parameters
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "64"))
+IVFFLAT_LISTS = int(os.getenv("IVFFLAT_LISTS", "0"))  # 0 = derive from row count
+INDEX_BUILD_MEMORY = os.getenv("INDEX_BUILD_MEMORY", "512MB")
+
+# Query-time parameters — applied to every connection used for search
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "40"))
+IVFFLAT_PROBES = int(os.getenv("IVFFLAT_PROBES", "10"))
+
+INDEX_NAMES = {
+    "hnsw": "ix_langchain_pg_embedding_hnsw",
+    "ivfflat": "ix_langchain_pg_embedding_ivfflat",
+}
+
+# Full-text search over chunk text (hybrid retrieval)
+TEXT_SEARCH_CONFIG = os.getenv("TEXT_SEARCH_CONFIG", "english")
+TEXT_COLUMN = "document_tsv"
+TEXT_INDEX_NAME = "ix_langchain_pg_embedding_document_tsv"
+
+
+def search_engine_args() -> dict:
+    """
+    SQLAlchemy engine args that set the ANN query parameters on every
+    new connection (libpq `options`), so no per-query SET is needed.
+    """
+    options = f"-c hnsw.ef_search={HNSW_EF_SEARCH} -c ivfflat.probes={IVFFLAT_PROBES}"
+    return {"connect_args": {"options": options}}
+
+
+def ivfflat_lists(rows: int) -> int:
+    """pgvector's guideline: rows/1000 up to 1M rows, sqrt(rows) above."""
+    if IVFFLAT_LISTS:
+        return IVFFLAT_LISTS
+    if rows <= 1_000_000:
+        return max(rows // 1000, 10)
+    return int(rows ** 0.5)
+
+
+def ensure_dimension(conn) -> None:
+    """ANN indexes need a fixed-dimension column; older tables use plain `vector`."""
+    column_type = conn.execute(text(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        f"WHERE attrelid = '{EMBEDDING_TABLE}'::regclass AND attname = 'embedding'"
+    )).scalar()
+    if column_type == "vector":
+        conn.execute(text(
+            f"ALTER TABLE {EMBEDDING_TABLE} "
+            f"ALTER COLUMN embedding TYPE vector({EMBEDDING_DIM})"
+        ))
+
+
+def create_index(engine, kind: str = VECTOR_INDEX_TYPE) -> None:
+    """Create the ANN index (cosine distance, matching PGVector's default)."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        ensure_dimension(conn)
+        conn.execute(text(f"SET maintenance_work_mem = '{INDEX_BUILD_MEMORY}'"))
+
+        if kind == "hnsw":
+            with_clause = f"m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION}"
+        elif kind == "ivfflat":
+            rows = conn.execute(text(f"SELECT count(*) FROM {EMBEDDING_TABLE}")).scalar()
+            with_clause = f"lists = {ivfflat_lists(rows)}"
+        else:
+            raise ValueError(f"Unknown index type: {kind}")
+
+        conn.execute(text(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAMES[kind]} "
+            f"ON {EMBEDDING_TABLE} USING {kind} (embedding vector_cosine_ops) "
+            f"WITH ({with_clause})"
+        ))
+
+
+def create_text_index(engine) -> None:
+    """
+    Add a generated tsvector column over the chunk text and a GIN index on
+    it. The column is kept up to date by Postgres on every insert/update.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(
+            f"ALTER TABLE {EMBEDDING_TABLE} ADD COLUMN IF NOT EXISTS {TEXT_COLUMN} tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(document, ''))) STORED"
+        ))
+        conn.execute(text(f"SET maintenance_work_mem = '{INDEX_BUILD_MEMORY}'"))
+        conn.execute(text(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {TEXT_INDEX_NAME} "
+            f"ON {EMBEDDING_TABLE} USING gin ({TEXT_COLUMN})"
+        ))
+
+
+def text_search_status(engine) -> tuple[bool, bool]:
+    """Whether the tsvector column and its GIN index exist."""
+    with engine.connect() as conn:
+        column = conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = :table AND column_name = :column)"
+        ), {"table": EMBEDDING_TABLE, "column": TEXT_COLUMN}).scalar()
+        index = conn.execute(text("SELECT to_regclass(:name)"), {"name": TEXT_INDEX_NAME}).scalar()
+    return bool(column), index is not None
+
+
+def drop_index(engine, kind: str | None = None) -> None:
+    kinds = [kind] if kind else list(INDEX_NAMES)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for k in kinds:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAMES[k]}"))
+
+
+def rebuild_index(engine, kind: str = VECTOR_INDEX_TYPE) -> None:
+    """Drop and recreate — needed for IVFFlat after bulk loads."""
+    drop_index(engine)
+    create_index(engine, kind)
+
+
+def reindex(engine) -> None:
+    """Rebuild existing ANN indexes in place without blocking searches."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for name in INDEX_NAMES.values():
+            exists = conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+            if exists:
+                conn.execute(text(f"REINDEX INDEX CONCURRENTLY {name}"))
+
+
+def index_status(engine) -> list[dict]:
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT indexname, indexdef, "
+            "pg_size_pretty(pg_relation_size(quote_ident(indexname)::regclass)) AS size "
+            "FROM pg_indexes WHERE tablename = :table"
+        ), {"table": EMBEDDING_TABLE}).mappings().all()
+        count = conn.execute(text(f"SELECT count(*) FROM {EMBEDDING_TABLE}")).scalar()
+    return [{"rows": count, **dict(row)} for row in rows]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the pgvector ANN index.")
+    parser.add_argument("command", choices=["status", "create", "rebuild", "reindex", "drop"])
+    parser.add_argument("--type", choices=list(INDEX_NAMES), default=VECTOR_INDEX_TYPE)
+    args = parser.parse_args()
+
+    assert DATABASE_URL, "DATABASE_URL is not set in .env"
+    engine = create_engine(DATABASE_URL)
+
+    if args.command == "create":
+        create_index(engine, args.type)
+        create_text_index(engine)
+    elif args.command == "rebuild":
+        rebuild_index(engine, args.type)
+    elif args.command == "reindex":
+        reindex(engine)
+    elif args.command == "drop":
+        drop_index(engine, args.type)
+
+    for row in index_status(engine):
+        print(f"{row['indexname']:<40} {row['size']:>10}  ({row['rows']} rows)")
+
+
+if __name__ == "__main__":
+    main()
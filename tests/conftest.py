@@ -0,0 +1,10 @@
+# tests/conftest.py
+"""
+Tests run without credentials or services. `src` modules read their
+environment at import, so the offline benchmark's placeholders (and its
+disabled disk caches) are applied before anything imports them.
+"""
+
+from benchmarks.fakes import offline_env
+
+offline_env()
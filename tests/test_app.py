@@ -0,0 +1,157 @@
+# tests/test_app.py
+
+import json
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessageChunk
+
+from benchmarks.fakes import install_fakes
+from src import app, language, rag, speech
+
+PATCHED = {
+    rag: ["llm", "PGVector", "get_session_history", "get_embeddings"],
+    language: ["llm"],
+    speech: ["client"],
+    app: ["get_session_history", "check_database", "pool_stats"],
+}
+CACHED = [rag.get_query_embedder, rag.get_retriever, rag.get_answer_chain, app.get_answer_cache]
+
+DB_LATENCY = 0.05
+
+
+@pytest.fixture
+def client():
+    """The API on the offline fakes: instant LLM and TTS, a slow vector store."""
+    saved = {(module, name): getattr(module, name) for module, names in PATCHED.items() for name in names}
+    install_fakes(llm_latency=0, stt_latency=0, tts_latency=0, db_latency=DB_LATENCY, jitter=0,
+                  fake_embeddings=True)
+    for cached in CACHED:
+        cached.cache_clear()
+    yield TestClient(app.app)
+    for (module, name), value in saved.items():
+        setattr(module, name, value)
+    for cached in CACHED:
+        cached.cache_clear()
+
+
+def server_timing(header: str) -> dict[str, float]:
+    stages = {}
+    for part in header.split(", "):
+        name, dur = part.split(";dur=")
+        stages[name] = float(dur)
+    return stages
+
+
+def test_llm_stage_covers_only_the_model_call(client):
+    response = client.post("/ask-text", params={"question": "What is a gerund?", "session_id": "s1"})
+
+    assert response.status_code == 200
+    stages = server_timing(response.headers["Server-Timing"])
+    assert {"history", "context", "llm", "tts"} <= set(stages)
+    # The vector store's round trip is retrieval time, not model time
+    assert stages["context"] >= 1000 * DB_LATENCY
+    assert stages["llm"] < 1000 * DB_LATENCY
+
+
+def test_stream_answers_and_records_the_turn(client):
+    response = client.post("/ask-text-stream", params={"question": "What is a gerund?", "session_id": "s2"})
+
+    events = [
+        json.loads(line[len("data: "):])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    done = events[-1]
+    assert done["llm_calls"] == 1
+    assert done["response_text"]
+    assert [m.type for m in app.get_session_history("s2").messages] == ["human", "ai"]
+
+
+def on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def test_batch_resolves_retriever_and_cache_off_the_event_loop(client, monkeypatch):
+    calls = []
+
+    class Retriever:
+        def retrieve_many(self, questions):
+            return [[] for _ in questions]
+
+    class AnswerCache:
+        def lookup(self, question, language):
+            return None
+
+        def store(self, question, language, answer):
+            pass
+
+    def resolve(name, value):
+        def get():
+            calls.append((name, on_event_loop()))
+            return value
+        return get
+
+    monkeypatch.setattr(app, "get_retriever", resolve("retriever", Retriever()))
+    monkeypatch.setattr(app, "get_answer_cache", resolve("answer_cache", AnswerCache()))
+
+    response = client.post("/ask-batch", json={"questions": ["What is a gerund?", "since or for?"]})
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[-1]["done"] and lines[-1]["errors"] == 0
+    assert {name for name, _ in calls} == {"retriever", "answer_cache"}
+    assert not any(loop for _, loop in calls)
+
+
+def test_stream_translates_an_answer_in_the_wrong_language(client, monkeypatch):
+    class EnglishChain:
+        def stream(self, inputs):
+            for token in ["A gerund is a verb ", "used as a noun. ", "For example: swimming is fun."]:
+                yield AIMessageChunk(content=token)
+
+    monkeypatch.setattr(app, "get_answer_chain", lambda: EnglishChain())
+
+    response = client.post("/ask-text-stream", params={
+        "question": "What is a gerund?", "session_id": "s3", "input_lang": "en", "output_lang": "ta",
+    })
+
+    events = [
+        (line[len("event: "):], json.loads(data[len("data: "):]))
+        for line, data in zip(response.text.splitlines(), response.text.splitlines()[1:])
+        if line.startswith("event: ")
+    ]
+    kinds = [kind for kind, _ in events]
+    translation = events[kinds.index("translation")][1]["text"]
+    done = events[-1][1]
+
+    assert kinds[-1] == "done"
+    assert done["response_text"] == translation
+    assert done["llm_calls"] == 2
+    voiced = [data["text"] for kind, data in events[kinds.index("translation"):] if kind == "audio"]
+    assert voiced and all(text in translation for text in voiced)
+
+
+class Embedder:
+    def embed_query(self, text):
+        return []
+
+
+def test_warm_up_retries_until_dependencies_recover(monkeypatch):
+    checks = iter([False, False, True])
+    monkeypatch.setattr(app, "check_database", lambda: next(checks))
+    monkeypatch.setattr(app, "get_retriever", lambda: None)
+    monkeypatch.setattr(app, "get_answer_cache", lambda: None)
+    monkeypatch.setattr(app, "get_query_embedder", Embedder)
+    monkeypatch.setattr(app, "WARMUP_RETRY_SECONDS", 0)
+    monkeypatch.setattr(app, "warmup_state", {"ready": False, "seconds": None, "attempts": 0, "error": None})
+
+    app.warm_up()
+
+    assert app.warmup_state["ready"] is True
+    assert app.warmup_state["attempts"] == 3
+    assert app.warmup_state["error"] is None
@@ -0,0 +1,46 @@
+# tests/test_audio.py
+
+import numpy as np
+
+from src.audio import decode_wav, encode_wav, prepare_for_stt
+
+RATE = 16000
+
+
+def tone(seconds: float, amplitude: float = 0.5, syllables_per_second: float = 4.0) -> np.ndarray:
+    """Voice-like signal: a 220 Hz tone whose loudness rises and falls per syllable."""
+    t = np.arange(int(seconds * RATE)) / RATE
+    envelope = 0.6 + 0.4 * np.abs(np.sin(np.pi * syllables_per_second * t))
+    return (amplitude * envelope * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return (0.002 * rng.standard_normal(int(seconds * RATE))).astype(np.float32)
+
+
+def test_continuous_speech_without_pauses_is_kept():
+    audio, reason = prepare_for_stt(encode_wav(tone(3.0), RATE))
+
+    assert reason is None
+    samples, _ = decode_wav(audio)
+    assert len(samples) / RATE > 2.9
+
+
+def test_silence_around_speech_is_trimmed():
+    clip = np.concatenate([silence(1.0), tone(1.0), silence(1.0)])
+    audio, reason = prepare_for_stt(encode_wav(clip, RATE))
+
+    assert reason is None
+    seconds = len(decode_wav(audio)[0]) / RATE
+    assert 1.0 <= seconds < 1.6  # speech plus padding on both sides
+
+
+def test_silent_clip_is_rejected():
+    assert prepare_for_stt(encode_wav(silence(2.0), RATE)) == (None, "silent")
+
+
+def test_short_blips_are_measured_before_padding():
+    # 0.12 s of voice in total; padding would stretch it past MIN_SPEECH_SECONDS
+    clip = np.concatenate([silence(1.0), tone(0.06), silence(0.5), tone(0.06), silence(1.0)])
+    assert prepare_for_stt(encode_wav(clip, RATE)) == (None, "too_short")
@@ -0,0 +1,45 @@
+# tests/test_cache.py
+
+from src import cache
+from src.cache import LRUCache, SqliteStore
+
+
+def test_eviction_drops_expired_entries_before_live_ones(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    lru = LRUCache(max_items=2, ttl=10, sizeof=lambda _: 1)
+
+    lru.set("stale", 1)
+    now[0] = 5
+    lru.set("live", 2)
+    lru.get("stale")  # most recently used, but stored at t=0
+    now[0] = 12
+    lru.set("new", 3)
+
+    assert lru.get("live") == 2
+    assert lru.get("new") == 3
+    assert lru.evictions == 0
+
+
+def test_items_skips_expired(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    lru = LRUCache(ttl=10)
+
+    lru.set("old", b"a")
+    now[0] = 8
+    lru.set("fresh", b"b")
+    now[0] = 11
+
+    assert lru.items() == [("fresh", b"b")]
+
+
+def test_sqlite_store_evicts_oldest_rows_over_max_bytes(tmp_path):
+    store = SqliteStore(str(tmp_path / "cache.sqlite"), max_bytes=1000)
+
+    for i in range(10):
+        store.set(f"clip-{i}", bytes(300))
+
+    assert len(store) <= 1000 // 300 + 1
+    assert store.get("clip-9") is not None
+    assert store.get("clip-0") is None
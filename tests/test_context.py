@@ -0,0 +1,36 @@
+# tests/test_context.py
+
+from langchain_core.documents import Document
+
+from src.context import pack_context, trim_to_budget
+from src.llm import estimate_tokens
+
+# Study notes as bullet lines: no ".", "!", "?" or "।" anywhere
+BULLETS = "\n".join(
+    f"• வினைச்சொல் {i} - present perfect உதாரணம் I have eaten" for i in range(40)
+)
+
+
+def test_passage_without_sentence_end_is_cut_on_a_word_boundary():
+    trimmed = trim_to_budget(BULLETS, 50)
+
+    assert trimmed
+    assert estimate_tokens(trimmed) <= 50
+    assert BULLETS.split()[: len(trimmed.split())] == trimmed.split()
+
+
+def test_sentences_are_kept_whole_when_one_fits():
+    text = "A gerund is a verb used as a noun. " + "It ends in -ing and names an activity " * 20
+
+    assert trim_to_budget(text, 40) == "A gerund is a verb used as a noun."
+
+
+def test_single_word_longer_than_the_budget_is_cut():
+    assert 0 < estimate_tokens(trim_to_budget("x" * 400, 10)) <= 10
+
+
+def test_oversized_best_chunk_is_packed_cut_to_the_budget():
+    packed = pack_context([Document(page_content=BULLETS), Document(page_content="Short second chunk.")], 60)
+
+    assert packed
+    assert packed == trim_to_budget(BULLETS, 60)
@@ -0,0 +1,78 @@
+# tests/test_embedding_server.py
+
+import os
+import stat
+import threading
+from multiprocessing.connection import AuthenticationError, Client, Listener
+
+import pytest
+
+from langchain_core.embeddings import Embeddings
+
+from src.embedding_server import (
+    RemoteEmbeddings,
+    accept_forever,
+    client_authkey,
+    key_path,
+    owner_only_listener,
+    server_authkey,
+)
+from src.embedding_service import QueryEmbedder
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+def test_queries_from_two_workers_share_one_sidecar_batch(tmp_path):
+    address = str(tmp_path / "embeddings.sock")
+    model = CountingEmbeddings()
+    embedder = QueryEmbedder(model, window_ms=200)
+    listener = Listener(address, family="AF_UNIX", authkey=b"test")
+    threading.Thread(target=accept_forever, args=(listener, embedder), daemon=True).start()
+
+    workers = [RemoteEmbeddings(address, "test"), RemoteEmbeddings(address, "test")]
+    results = {}
+    threads = [
+        threading.Thread(target=lambda w=w, q=q: results.setdefault(q, w.embed_query(q)))
+        for w, q in zip(workers, ["what is a gerund?", "since or for?"])
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert results == {"what is a gerund?": [17.0], "since or for?": [13.0]}
+    assert len(model.calls) == 1 and sorted(model.calls[0]) == sorted(results)
+    assert workers[0].stats()["batches"] == 1
+
+    # Repeats are served from the sidecar's shared cache
+    assert workers[1].embed_query("what is a gerund?") == [17.0]
+    assert len(model.calls) == 1
+
+
+def test_generated_key_and_socket_are_owner_only(tmp_path):
+    address = str(tmp_path / "embeddings.sock")
+    authkey = server_authkey(address, None)
+    listener = owner_only_listener(address, authkey)
+    threading.Thread(target=accept_forever, args=(listener, QueryEmbedder(CountingEmbeddings())), daemon=True).start()
+
+    assert stat.S_IMODE(os.stat(key_path(address)).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(address).st_mode) & 0o077 == 0
+    assert client_authkey(address, None) == authkey
+    assert RemoteEmbeddings(address, None).embed_query("gerund") == [6.0]
+    with pytest.raises(AuthenticationError):
+        Client(address, family="AF_UNIX", authkey=b"ai-tutor")
+
+
+def test_client_without_a_key_refuses_to_connect(tmp_path):
+    with pytest.raises(RuntimeError, match="EMBEDDING_SERVICE_AUTHKEY"):
+        RemoteEmbeddings(str(tmp_path / "embeddings.sock"), None)
@@ -0,0 +1,32 @@
+# tests/test_history.py
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.history import recent_window
+
+
+def turns(*pairs):
+    rows = []
+    for question, answer in pairs:
+        rows.append((len(rows) + 1, HumanMessage(content=question)))
+        rows.append((len(rows) + 1, AIMessage(content=answer)))
+    return rows
+
+
+def test_window_starts_on_a_human_turn():
+    rows = turns(("Explain this passage: " + "x" * 400, "It is a gerund."), ("And a participle?", "y" * 40))
+    # The budget fits the first answer but not its long question
+    window = recent_window(rows, budget=60)
+
+    assert [row_id for row_id, _ in window] == [3, 4]
+    assert window[0][1].type == "human"
+
+
+def test_window_drops_orphaned_answer_that_alone_exceeds_budget():
+    rows = turns(("What is a gerund?", "x" * 400))
+    assert recent_window(rows, budget=10) == []
+
+
+def test_window_keeps_everything_within_budget():
+    rows = turns(("Hi", "Hello"), ("What is a noun?", "A naming word."))
+    assert recent_window(rows, budget=1000) == rows
@@ -0,0 +1,22 @@
+# tests/test_ingest.py
+
+from src.ingest import up_to_date
+
+ENTRY = {"sha256": "abc", "ids": ["c1", "c2"]}
+
+
+def test_unchanged_file_with_all_chunks_stored_is_up_to_date():
+    assert up_to_date(ENTRY, "abc", {"c1", "c2", "other"})
+
+
+def test_changed_file_is_not_up_to_date():
+    assert not up_to_date(ENTRY, "def", {"c1", "c2"})
+
+
+def test_chunks_missing_from_the_database_force_a_reingest():
+    assert not up_to_date(ENTRY, "abc", set())
+    assert not up_to_date(ENTRY, "abc", {"c1"})
+
+
+def test_untracked_file_is_not_up_to_date():
+    assert not up_to_date(None, "abc", {"c1"})
@@ -0,0 +1,53 @@
+# tests/test_language.py
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from benchmarks.language_detection import CORPUS
+from src import language
+from src.language import detect_language, translate_text
+
+
+@pytest.mark.parametrize("text, expected", CORPUS)
+def test_detect_language(text, expected):
+    assert detect_language(text) == expected
+
+
+class ScriptedLLM:
+    """Replies with the given texts in turn and counts calls."""
+
+    def __init__(self, *replies: str):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return AIMessage(content=self.replies.pop(0))
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    language.translation_memory.memory.clear()
+
+    def install(*replies):
+        scripted = ScriptedLLM(*replies)
+        monkeypatch.setattr(language, "llm", scripted)
+        return scripted
+    return install
+
+
+def test_translate_text_counts_the_whole_text_fallback(llm):
+    scripted = llm("not numbered at all", "ஜெரண்ட் ஒரு பெயர்ச்சொல். உதாரணம்.")
+
+    text, calls = translate_text("A gerund is a noun. For example.", "ta")
+
+    assert text == "ஜெரண்ட் ஒரு பெயர்ச்சொல். உதாரணம்."
+    assert calls == scripted.calls == 2
+
+
+def test_translate_text_counts_batch_and_memory_hits(llm):
+    scripted = llm("[1] ஜெரண்ட் ஒரு பெயர்ச்சொல்.")
+
+    assert translate_text("A gerund is a noun.", "ta") == ("ஜெரண்ட் ஒரு பெயர்ச்சொல்.", 1)
+    assert translate_text("A gerund is a noun.", "ta") == ("ஜெரண்ட் ஒரு பெயர்ச்சொல்.", 0)
+    assert scripted.calls == 1
@@ -0,0 +1,49 @@
+# tests/test_rag.py
+
+import pytest
+from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+from src import rag
+
+
+class NoDocs:
+    def retrieve(self, question):
+        return []
+
+
+@pytest.fixture
+def prompts(monkeypatch):
+    """Every prompt the chain sends to the LLM, as a list of messages."""
+    sent = []
+
+    def fake_llm(prompt_value):
+        sent.append(prompt_value.to_messages())
+        return AIMessage(content="A gerund is a verb used as a noun.")
+
+    monkeypatch.setattr(rag, "llm", RunnableLambda(fake_llm))
+    monkeypatch.setattr(rag, "get_retriever", lambda: NoDocs())
+    rag.get_answer_chain.cache_clear()
+    yield sent
+    rag.get_answer_chain.cache_clear()
+
+
+def test_qa_chain_sends_session_history_to_the_llm(monkeypatch, prompts):
+    history = InMemoryChatMessageHistory(messages=[
+        HumanMessage(content="What is a gerund?"),
+        AIMessage(content="A verb form ending in -ing used as a noun."),
+    ])
+    monkeypatch.setattr(rag, "get_session_history", lambda session_id: history)
+
+    rag.get_qa_chain().invoke(
+        {"question": "Give me an example.", "language": "English"},
+        config={"configurable": {"session_id": "s1"}},
+    )
+
+    contents = [message.content for message in prompts[0]]
+    assert "What is a gerund?" in contents
+    assert "A verb form ending in -ing used as a noun." in contents
+    assert contents[-1] == "Give me an example."
+    # The new turn is written back for the next question
+    assert len(history.messages) == 4
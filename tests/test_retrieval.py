@@ -0,0 +1,72 @@
+# tests/test_retrieval.py
+
+import logging
+
+import pytest
+from langchain_core.documents import Document
+from sqlalchemy.exc import ProgrammingError
+
+from src import retrieval
+from src.retrieval import HybridRetriever
+
+
+class FailingEngine:
+    """Engine whose queries fail the way a bad statement does."""
+
+    def __init__(self):
+        self.queries = 0
+
+    def connect(self):
+        self.queries += 1
+        raise ProgrammingError("SELECT ...", {}, Exception("syntax error in tsquery"))
+
+
+def retriever(monkeypatch, column: bool, index: bool = True) -> HybridRetriever:
+    monkeypatch.setattr(retrieval, "text_search_status", lambda engine: (column, index))
+    return HybridRetriever(None, None, FailingEngine(), "docs", mode="lexical")
+
+
+def test_missing_column_disables_lexical_search_with_a_warning(monkeypatch, caplog):
+    with caplog.at_level(logging.WARNING, logger="src.retrieval"):
+        r = retriever(monkeypatch, column=False)
+
+    assert r.lexical_search_many(["what is a gerund?"], 5) == [[]]
+    assert r.engine.queries == 0
+    assert "missing" in caplog.text
+
+
+@pytest.mark.parametrize("index", [True, False])
+def test_query_errors_do_not_disable_lexical_search(monkeypatch, caplog, index):
+    r = retriever(monkeypatch, column=True, index=index)
+
+    with caplog.at_level(logging.WARNING, logger="src.retrieval"):
+        assert r.lexical_search("what is a gerund?", 5) == []
+        assert r.lexical_search("since or for?", 5) == []
+
+    assert r.engine.queries == 2
+    assert "full-text search failed" in caplog.text
+
+
+def test_retrieve_many_reranks_only_the_candidates(monkeypatch):
+    def docs(*ids):
+        return [Document(id=i, page_content=i) for i in ids]
+
+    class Reranker:
+        def predict(self, pairs):
+            # Prefer later candidates, so the order visibly changes
+            return list(range(len(pairs)))
+
+    class Embedder:
+        def embed_queries(self, questions):
+            return [[0.0] for _ in questions]
+
+    monkeypatch.setattr(retrieval, "text_search_status", lambda engine: (True, True))
+    r = HybridRetriever(None, Embedder(), None, "docs", k=2, candidates=3, mode="hybrid", reranker=Reranker())
+    # Dense and lexical disagree entirely: 6 fused docs for 3 candidate slots
+    monkeypatch.setattr(r, "dense_search_many", lambda vectors, limit: [docs("a", "b", "c")])
+    monkeypatch.setattr(r, "lexical_search_many", lambda questions, limit: [docs("x", "y", "z")])
+
+    [result] = r.retrieve_many(["what is a gerund?"])
+
+    fused = [d.id for d in retrieval.reciprocal_rank_fusion([docs("a", "b", "c"), docs("x", "y", "z")])]
+    assert [d.id for d in result] == fused[:3][::-1][:2]
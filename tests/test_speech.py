@@ -0,0 +1,44 @@
+# tests/test_speech.py
+
+from src import speech
+from src.speech import split_for_tts, synthesize_speech
+
+
+class RecordingTTS:
+    def __init__(self):
+        self.texts: list[str] = []
+
+    def convert(self, text: str, voice_id: str, model_id: str, **kwargs):
+        self.texts.append(text)
+        yield text.encode()
+
+
+class FakeClient:
+    def __init__(self):
+        self.text_to_speech = RecordingTTS()
+
+
+def test_long_sentences_are_split_on_word_boundaries():
+    sentence = "word " * 100
+
+    chunks = split_for_tts(f"Short one. {sentence}")
+
+    assert chunks[0] == "Short one."
+    assert all(len(chunk) <= speech.MAX_CHUNK_LEN for chunk in chunks)
+    assert " ".join(chunks[1:]) == sentence.strip()
+
+
+def test_english_answers_reuse_cached_sentences(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(speech, "client", client)
+    speech.tts_cache.memory.clear()
+
+    synthesize_speech("A gerund is a verb used as a noun.\n- Swimming is fun.", "en")
+    audio = synthesize_speech("A gerund is a verb used as a noun.\n- Reading is relaxing.", "en")
+
+    assert client.text_to_speech.texts == [
+        "A gerund is a verb used as a noun.",
+        "- Swimming is fun.",
+        "- Reading is relaxing.",
+    ]
+    assert audio == b"A gerund is a verb used as a noun.- Reading is relaxing."